@@ -3,4 +3,68 @@ Custom integration to integrate Enedis teleinformation with Home Assistant.
 
 For more details about this integration, please refer to
 https://github.com/sberthelot/teleinfo-home-assistant/
-"""
\ No newline at end of file
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_AGGREGATES,
+    CONF_COUNTERTYPE,
+    CONF_DEVICE,
+    CONF_EVENTS,
+    CONF_HISTORY,
+    CONF_LIVE,
+    CONF_REFRESH,
+    DEFAULT_EVENTS,
+    DEFAULT_REFRESH,
+    DOMAIN,
+    PLATFORMS,
+    TELEINFO_EVENTS_FRAME,
+)
+from .coordinator import TeleinfoCoordinator
+from .reader import TeleinfoReader
+from .scheduler import async_get_scheduler
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Start reading the meter of a config entry.
+
+    The reader starts before the platforms are set up, so that the first frame
+    is published as soon as it is received.
+    """
+    options = entry.options
+    reader = TeleinfoReader(entry.data[CONF_DEVICE], entry.data[CONF_COUNTERTYPE])
+    coordinator = TeleinfoCoordinator(
+        hass,
+        reader,
+        entry.data[CONF_COUNTERTYPE],
+        timedelta(seconds=int(options.get(CONF_REFRESH, DEFAULT_REFRESH))),
+        options.get(CONF_EVENTS, DEFAULT_EVENTS) == TELEINFO_EVENTS_FRAME,
+        options.get(CONF_LIVE, False),
+        options.get(CONF_AGGREGATES, False),
+        options.get(CONF_HISTORY, 0),
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    async_get_scheduler(hass).async_add_meter(coordinator)
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    return True
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Stop reading the meter of a config entry."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator: TeleinfoCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await async_get_scheduler(hass).async_remove_meter(coordinator)
+    return unload_ok
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,48 @@
+"""Running aggregate of label values over a refresh window.
+
+Only the min, max, sum, last value and count are kept, so that folding every
+frame costs a few comparisons, whatever the number of frames in the window,
+and the summary is exact.
+"""
+from __future__ import annotations
+
+
+class WindowAggregate:
+    """Min, max, mean and last value of a numeric label since the last clear."""
+
+    __slots__ = ("_min", "_max", "_sum", "_last", "count")
+
+    def __init__(self) -> None:
+        """Initialize the aggregate."""
+        self._min: int | float = 0
+        self._max: int | float = 0
+        self._sum: int | float = 0
+        self._last: int | float = 0
+        self.count = 0
+
+    def append(self, value: int | float) -> None:
+        """Fold a value into the aggregate."""
+        if self.count:
+            if value < self._min:
+                self._min = value
+            elif value > self._max:
+                self._max = value
+            self._sum += value
+        else:
+            self._min = self._max = self._sum = value
+        self._last = value
+        self.count += 1
+
+    def clear(self) -> None:
+        """Forget all the values."""
+        self.count = 0
+
+    def summary(self) -> dict[str, int | float]:
+        """Return the min, max, mean and last values and the value count."""
+        return {
+            "min": self._min,
+            "max": self._max,
+            "mean": round(self._sum / self.count, 1),
+            "last": self._last,
+            "count": self.count,
+        }
@@ -0,0 +1,155 @@
+"""Raw TIC capture to a rotating compressed log.
+
+The bytes received from the port are recorded with their monotonic reception
+time, batched in memory and written by a single background thread to gzip
+files rotated by size, like a RotatingFileHandler: path, path.1, path.2...
+Each batch is sync flushed, so that a file left open by a crash can be read
+up to its last batch.
+
+Each file starts with CAPTURE_MAGIC followed by records made of a
+little-endian float64 timestamp, a uint32 length and the received bytes.
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import logging
+import os
+import struct
+import time
+import zlib
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b'TICCAP1\n'
+GZIP_MAGIC = b'\x1f\x8b'
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Batches are written every FLUSH_INTERVAL seconds, or once FLUSH_SIZE bytes
+# are buffered.
+FLUSH_INTERVAL = 10
+FLUSH_SIZE = 64 * 1024
+
+_RECORD = struct.Struct('<dI')
+
+
+class TeleinfoCapture:
+    """Record raw TIC bytes to rotating gzip files off the event loop."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Initialize the capture, max_bytes is the uncompressed size of a file."""
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._records: list[bytes] = []
+        self._buffered = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="teleinfo_capture")
+        self._file: gzip.GzipFile | None = None
+        self._written = 0
+        self.bytes_captured = 0
+
+    def write(self, data: bytes) -> None:
+        """Record a received chunk, from the event loop."""
+        self._records.append(_RECORD.pack(time.monotonic(), len(data)))
+        self._records.append(data)
+        self._buffered += len(data)
+        self.bytes_captured += len(data)
+        if self._buffered >= FLUSH_SIZE:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(FLUSH_INTERVAL, self._flush)
+
+    def _flush(self) -> None:
+        """Hand the buffered records to the writing thread."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._records:
+            return
+        batch = b''.join(self._records)
+        self._records.clear()
+        self._buffered = 0
+        asyncio.get_running_loop().run_in_executor(self._executor, self._write_batch, batch)
+
+    async def async_close(self) -> None:
+        """Write the buffered records and close the current file."""
+        self._flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_file)
+        self._executor.shutdown(wait=False)
+
+    def _write_batch(self, batch: bytes) -> None:
+        """Append a batch to the current file, rotating it when full."""
+        try:
+            if self._file is None:
+                if os.path.exists(self._path):
+                    self._rotate()
+                self._file = gzip.open(self._path, 'wb')
+                self._file.write(CAPTURE_MAGIC)
+                self._written = 0
+            self._file.write(batch)
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+            self._written += len(batch)
+            if self._written >= self._max_bytes:
+                # The next batch rotates it
+                self._close_file()
+        except OSError as exception:
+            _LOGGER.warning("Unable to write the capture %s: %s", self._path, exception)
+            self._close_file()
+
+    def _close_file(self) -> None:
+        """Close the current file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        """Shift the backups and the current file by one."""
+        for index in range(self._backup_count - 1, 0, -1):
+            source = f"{self._path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self._path}.{index + 1}")
+        if self._backup_count:
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+
+
+def _decompress(data: bytes) -> bytes:
+    """Return the content of gzip data, up to its end if it is truncated."""
+    decompressor = zlib.decompressobj(wbits=31)
+    content = decompressor.decompress(data)
+    # Concatenated captures are made of several gzip members
+    while decompressor.eof and decompressor.unused_data:
+        data = decompressor.unused_data
+        decompressor = zlib.decompressobj(wbits=31)
+        content += decompressor.decompress(data)
+    return content
+
+
+def read_capture(path: str) -> list[tuple[float, bytes]]:
+    """Return the (monotonic time, bytes) records of a capture file."""
+    with open(path, 'rb') as capture:
+        data = capture.read()
+    if data.startswith(GZIP_MAGIC):
+        data = _decompress(data)
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError(f"{path} is not a Teleinfo capture")
+
+    records = []
+    offset = len(CAPTURE_MAGIC)
+    while offset + _RECORD.size <= len(data):
+        timestamp, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        records.append((timestamp, data[offset:offset + length]))
+        offset += length
+    return records
@@ -0,0 +1,35 @@
+"""Teleinfo group checksum validation.
+
+The checksum of a group is the sum of its bytes, truncated to 6 bits and
+offset by 0x20 to keep it printable. Method A (historical mode) sums the
+label and value fields without the separator preceding the checksum,
+method B (standard mode) includes that separator.
+"""
+from __future__ import annotations
+
+from .parser import SP, TeleinfoFrame
+
+
+def compute_checksum(raw: bytes, separator: int) -> int:
+    """Return the expected checksum of a raw group."""
+    data = sum(raw) - raw[-1]
+    if separator == SP:
+        # Method A stops before the last separator
+        data -= separator
+    return (data & 0x3F) + 0x20
+
+
+def validate_frame(frame: TeleinfoFrame) -> tuple[TeleinfoFrame, int]:
+    """Check all the groups of a frame in one pass.
+
+    The 6-bit checksum cannot see a flipped bit 7, so groups with non ASCII
+    bytes are dropped as well. Return the valid groups and the number of
+    dropped invalid ones.
+    """
+    valid = tuple(
+        group
+        for group in frame
+        if group.raw.isascii()
+        and compute_checksum(group.raw, group.separator) == group.checksum
+    )
+    return valid, len(frame) - len(valid)
@@ -4,16 +4,23 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 
-from . import sensor
+from . import discovery
+from .const import CONF_AGGREGATES
 from .const import CONF_COUNTERTYPE
 from .const import CONF_DEVICE
-from .const import CONF_TIMEOUT
-from .const import DEFAULT_CONF_TIMEOUT
+from .const import CONF_EVENTS
+from .const import CONF_HISTORY
+from .const import CONF_LIVE
+from .const import CONF_REFRESH
+from .const import DEFAULT_EVENTS
+from .const import DEFAULT_REFRESH
 from .const import DOMAIN
 from .const import ERROR_INVALID_DONGLE_PATH
 from .const import MANUAL_PATH_VALUE
-from .const import SENSOR_HISTORICAL
-from .const import SENSOR_STANDARD
+from .const import REFRESH_CHOICES
+from .const import TELEINFO_EVENTS_FRAME
+from .const import TELEINFO_EVENTS_NONE
+from .history import MAX_HISTORY_SIZE
 
 class TeleinfoFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for teleinfo."""
@@ -25,31 +32,11 @@ class TeleinfoFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize."""
 
     async def async_step_user(self, user_input=None):
-        """Handle an TeleInfo config flow start."""
-        if self._async_current_entries():
-            return self.async_abort(reason="single_instance_allowed")
+        """Handle an TeleInfo config flow start.
 
-        return await self.async_step_metertype()
-
-    async def async_step_metertype(self, user_input=None):
-        """Propose a list of meter type."""
-        errors = {}
-
-        if user_input is not None:
-            return await self.async_step_detect()
-
-        known_meter = {
-            SENSOR_HISTORICAL: "Mode historique",
-            SENSOR_STANDARD: "Mode standard",
-        }
-
-        return self.async_show_form(
-            step_id="detect",
-            data_schema=vol.Schema(
-                {vol.Required(CONF_COUNTERTYPE): vol.In(known_meter)}
-            ),
-            errors=errors,
-        )
+        The TIC mode is detected from the frames of the meter.
+        """
+        return await self.async_step_detect()
 
     async def async_step_detect(self, user_input=None):
         """Propose a list of detected dongles."""
@@ -61,7 +48,7 @@ class TeleinfoFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_create_entry(title="TeleInfo", data=user_input)
             errors = {CONF_DEVICE: ERROR_INVALID_DONGLE_PATH}
 
-        bridges = sensor.detect()
+        bridges = await discovery.async_detect(self.hass)
         if len(bridges) == 0:
             return await self.async_step_manual(user_input)
 
@@ -98,29 +85,38 @@ class TeleinfoFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         return OptionsFlowHandler(config_entry)
 
     async def validate_teleinformation_device(self, user_input) -> bool:
-        """Return True if the user_input contains a valid dongle path."""
+        """Return True if a meter sends frames on the user_input dongle path.
+
+        The TIC mode, told by the separator of the received frames rather than
+        the baud rate ignored by network bridges, is stored in user_input.
+        """
         serial_path = user_input[CONF_DEVICE]
-        path_is_valid = sensor.validate_path(serial_path)
+        self._async_abort_entries_match({CONF_DEVICE: serial_path})
+        ticmode = await discovery.async_validate_path(self.hass, serial_path)
+        if ticmode is None:
+            return False
 
-        return path_is_valid
+        user_input[CONF_COUNTERTYPE] = ticmode
+        return True
 
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle a option flow for teleinformation."""
 
     def __init__(self, config_entry: config_entries.ConfigEntry):
-        """Initialize options flow."""
-        self.config_entry = config_entry
+        """Initialize options flow.
+
+        Newer Home Assistant versions provide self.config_entry and reject its
+        assignment, older ones do not, so the entry is kept under another name.
+        """
+        self._config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
         """Handle options flow."""
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
-        scan_interval = self.config_entry.options.get(
-            CONF_TIMEOUT, DEFAULT_CONF_TIMEOUT
-        )
-
+        options = self._config_entry.options
         errors = {}
 
         if errors:
@@ -130,7 +126,21 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id="init",
             data_schema=vol.Schema(
                 {
-                    vol.Optional(CONF_TIMEOUT, default=scan_interval): cv.positive_int,
+                    vol.Optional(
+                        CONF_REFRESH, default=options.get(CONF_REFRESH, DEFAULT_REFRESH)
+                    ): vol.In(REFRESH_CHOICES),
+                    vol.Optional(
+                        CONF_EVENTS, default=options.get(CONF_EVENTS, DEFAULT_EVENTS)
+                    ): vol.In([TELEINFO_EVENTS_NONE, TELEINFO_EVENTS_FRAME]),
+                    vol.Optional(
+                        CONF_LIVE, default=options.get(CONF_LIVE, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_AGGREGATES, default=options.get(CONF_AGGREGATES, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_HISTORY, default=options.get(CONF_HISTORY, 0)
+                    ): vol.All(cv.positive_int, vol.Range(max=MAX_HISTORY_SIZE)),
                 }
             ),
             errors=errors,
@@ -138,4 +148,4 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_abort(self, user_input=None):
         """Abort options flow."""
-        return self.async_create_entry(title="", data=self.config_entry.options)
\ No newline at end of file
+        return self.async_create_entry(title="", data=self._config_entry.options)
\ No newline at end of file
@@ -1,17 +1,30 @@
 """Constants for teleinformation."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
 
 from homeassistant.components.sensor import (
+    SensorEntityDescription,
     SensorStateClass,
     SensorDeviceClass,
 )
 from homeassistant.const import (
+    EntityCategory,
     Platform,
     UnitOfElectricCurrent,
+    UnitOfElectricPotential,
     UnitOfEnergy,
     UnitOfPower,
     UnitOfApparentPower,
+    UnitOfDataRate,
+    UnitOfTime,
 )
 
+from . import converters
+
 
 DOMAIN = "teleinfo"
 DEVICE_MANUFACTURER = "Enedis"
@@ -22,70 +35,342 @@ PLATFORMS: list[Platform] = [Platform.SENSOR]
 TIC_MODE_HISTORICAL = "historical"
 TIC_MODE_STANDARD = "standard"
 
+EVENT_TELEINFO_FRAME = "teleinfo_frame"
+SERVICE_GET_HISTORY = "get_history"
+TELEINFO_EVENTS_NONE = "none"
+TELEINFO_EVENTS_FRAME = "frame"
+
+# Config entry data.
+CONF_DEVICE = "device"
+CONF_COUNTERTYPE = "countertype"
+MANUAL_PATH_VALUE = "manual"
+ERROR_INVALID_DONGLE_PATH = "invaliddongle"
+
+# Options, shared with the YAML platform configuration.
+CONF_REFRESH = "refresh"
+CONF_EVENTS = "events"
+CONF_LIVE = "live"
+CONF_AGGREGATES = "aggregates"
+CONF_HISTORY = "history"
+
+REFRESH_CHOICES = [10, 30, 60, 120, 300]
+DEFAULT_REFRESH = 30
+DEFAULT_EVENTS = TELEINFO_EVENTS_NONE
+
+
+@dataclass(frozen=True, kw_only=True)
+class TeleinfoLabel(SensorEntityDescription):
+    """Descriptor of a TIC label, shared by the entities of all the meters."""
+
+    converter: Callable[[str], Any] = str
+    # Decoder of the attributes of a structured value
+    attributes: Callable[[str], dict[str, Any]] | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class TeleinfoDiagnosticDescription(SensorEntityDescription):
+    """Descriptor of a reader or coordinator counter."""
+
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    state_class: SensorStateClass | str | None = SensorStateClass.TOTAL_INCREASING
+    icon: str | None = "mdi:alert-circle-outline"
+    # Object holding the counter, 'reader' or 'coordinator'
+    source: str = 'reader'
+    # Only created in live mode
+    live: bool = False
+    # Value of the counter, the attribute named key of the source by default
+    value_fn: Callable[[Any], Any] | None = None
+
+
+def _statistic(key, name, source='reader', value_fn=None, **kwargs):
+    """Return the description of a statistic sensor, disabled by default."""
+    return TeleinfoDiagnosticDescription(
+        key=key,
+        name=name,
+        source=source,
+        value_fn=value_fn,
+        entity_registry_enabled_default=False,
+        **kwargs,
+    )
+
+
+def _mean_duration(key, name, source='reader'):
+    return _statistic(
+        key,
+        name,
+        source,
+        lambda source: getattr(source, key).mean,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    )
+
+
+def _string(key, name, icon=None, converter=str, attributes=None):
+    return TeleinfoLabel(
+        key=key, name=name, icon=icon, converter=converter, attributes=attributes
+    )
+
+
+def _enum(key, name, converter, options):
+    return TeleinfoLabel(
+        key=key,
+        name=name,
+        converter=converter,
+        device_class=SensorDeviceClass.ENUM,
+        options=list(options),
+    )
+
+
+def _integer(key, name, device_class=None, unit=None, icon=None):
+    return TeleinfoLabel(
+        key=key,
+        name=name,
+        converter=int,
+        device_class=device_class,
+        native_unit_of_measurement=unit,
+        icon=icon,
+    )
+
+
+def _measurement(key, name, device_class, unit, icon):
+    return TeleinfoLabel(
+        key=key,
+        name=name,
+        converter=int,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=device_class,
+        native_unit_of_measurement=unit,
+        icon=icon,
+    )
+
+
+def _current(key, name):
+    return _measurement(
+        key, name, SensorDeviceClass.CURRENT, UnitOfElectricCurrent.AMPERE, 'mdi:current-ac'
+    )
+
+
+def _voltage(key, name):
+    return _measurement(
+        key, name, SensorDeviceClass.VOLTAGE, UnitOfElectricPotential.VOLT, 'mdi:sine-wave'
+    )
+
+
+def _apparent_power(key, name):
+    return _measurement(
+        key, name, SensorDeviceClass.APPARENT_POWER, UnitOfApparentPower.VOLT_AMPERE, 'mdi:flash'
+    )
+
+
+def _energy(key, name, device_class=SensorDeviceClass.ENERGY, unit=UnitOfEnergy.WATT_HOUR):
+    return TeleinfoLabel(
+        key=key,
+        name=name,
+        converter=int,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device_class=device_class,
+        native_unit_of_measurement=unit,
+        icon='mdi:counter',
+    )
+
+
+PHASES = (1, 2, 3)
+
 TELEINFO_ENTITIES = {
     TIC_MODE_HISTORICAL: [
-        ],
-
-    TIC_MODE_STANDARD: {
-        "string": [
-                    {
-                        "name": DOMAIN + ' Nom du calendrier tarifaire fournisseur',
-                        "key": 'NGTF',
-                        "state_class": None,
-                        "device_class": SensorDeviceClass.ENUM,
-                        "unit": None,
-                        "icon": None
-                    },
-                    {
-                        "name": DOMAIN + ' Libellé tarif fournisseur en cours',
-                        "key": 'LTARF',
-                        "state_class": None,
-                        "device_class": SensorDeviceClass.ENUM,
-                        "unit": None,
-                        "icon": None
-                    },
-                    {
-                        "name": DOMAIN + ' PRM',
-                        "key": 'PRM',
-                        "state_class": None,
-                        "device_class": SensorDeviceClass.ENUM,
-                        "unit": None,
-                        "icon": 'mdi:eye'
-                    },
-            ],
-        "integer": [
-                    {
-                        "name": DOMAIN + ' Courant efficace, phase 1',
-                        "key": 'IRMS1',
-                        "state_class": SensorStateClass.MEASUREMENT,
-                        "device_class": SensorDeviceClass.CURRENT,
-                        "unit": UnitOfElectricCurrent.AMPERE,
-                        "icon": 'mdi:current-ac'
-                    },
-                    {
-                        "name": DOMAIN + ' Puissance app. de coupure',
-                        "key": 'PCOUP',
-                        "state_class": SensorStateClass.MEASUREMENT,
-                        "device_class": SensorDeviceClass.POWER,
-                        "unit": UnitOfPower.KILO_WATT,
-                        "icon": 'mdi:current-ac'
-                    },
-                    {
-                        "name": DOMAIN + ' Puissance app. instantanée soutirée',
-                        "key": 'SINSTS',
-                        "state_class": SensorStateClass.MEASUREMENT,
-                        "device_class": SensorDeviceClass.APPARENT_POWER,
-                        "unit": UnitOfApparentPower.VOLT_AMPERE,
-                        "icon": 'mdi:flash'
-                    },
-                    {
-                        "name": DOMAIN + ' Puissance app. max. soutirée n',
-                        "key": 'SMAXSN',
-                        "state_class": SensorStateClass.MEASUREMENT,
-                        "device_class": SensorDeviceClass.APPARENT_POWER,
-                        "unit": UnitOfApparentPower.VOLT_AMPERE,
-                        "icon": 'mdi:flash'
-                    },
-            ]
-        }
-    }
\ No newline at end of file
+        _string('ADCO', 'Adresse du compteur', 'mdi:eye'),
+        _string('OPTARIF', 'Option tarifaire choisie'),
+        _current('ISOUSC', 'Intensité souscrite'),
+        _energy('BASE', 'Index option Base'),
+        _energy('HCHC', 'Index heures creuses'),
+        _energy('HCHP', 'Index heures pleines'),
+        _energy('EJPHN', 'Index EJP heures normales'),
+        _energy('EJPHPM', 'Index EJP heures de pointe mobile'),
+        _energy('BBRHCJB', 'Index Tempo heures creuses jours bleus'),
+        _energy('BBRHPJB', 'Index Tempo heures pleines jours bleus'),
+        _energy('BBRHCJW', 'Index Tempo heures creuses jours blancs'),
+        _energy('BBRHPJW', 'Index Tempo heures pleines jours blancs'),
+        _energy('BBRHCJR', 'Index Tempo heures creuses jours rouges'),
+        _energy('BBRHPJR', 'Index Tempo heures pleines jours rouges'),
+        _integer('PEJP', 'Préavis début EJP', SensorDeviceClass.DURATION, UnitOfTime.MINUTES),
+        _enum('PTEC', 'Période tarifaire en cours', converters.ptec, converters.PTEC_OPTIONS),
+        _enum('DEMAIN', 'Couleur du lendemain', converters.demain,
+              converters.DEMAIN_OPTIONS.values()),
+        _current('IINST', 'Intensité instantanée'),
+        *(_current(f'IINST{n}', f'Intensité instantanée, phase {n}') for n in PHASES),
+        _current('ADPS', 'Avertissement de dépassement de puissance souscrite'),
+        _current('IMAX', 'Intensité maximale appelée'),
+        *(_current(f'IMAX{n}', f'Intensité maximale appelée, phase {n}') for n in PHASES),
+        _measurement('PMAX', 'Puissance maximale triphasée atteinte',
+                     SensorDeviceClass.POWER, UnitOfPower.WATT, 'mdi:flash'),
+        _apparent_power('PAPP', 'Puissance apparente'),
+        _string('HHPHC', 'Horaire heures pleines heures creuses'),
+        _string('MOTDETAT', 'Mot d\'état du compteur'),
+        _string('PPOT', 'Présence des potentiels'),
+        *(_current(f'ADIR{n}', f'Avertissement de dépassement d\'intensité, phase {n}')
+          for n in PHASES),
+    ],
+
+    TIC_MODE_STANDARD: [
+        _string('ADSC', 'Adresse secondaire du compteur', 'mdi:eye'),
+        _string('VTIC', 'Version de la TIC'),
+        _string('NGTF', 'Nom du calendrier tarifaire fournisseur', converter=converters.text),
+        _string('LTARF', 'Libellé tarif fournisseur en cours', converter=converters.text),
+        _energy('EAST', 'Energie active soutirée totale'),
+        *(_energy(f'EASF{n:02}', f'Energie active soutirée fournisseur, index {n:02}')
+          for n in range(1, 11)),
+        *(_energy(f'EASD{n:02}', f'Energie active soutirée distributeur, index {n:02}')
+          for n in range(1, 5)),
+        _energy('EAIT', 'Energie active injectée totale'),
+        *(_energy(f'ERQ{n}', f'Energie réactive Q{n} totale', None, 'VArh') for n in range(1, 5)),
+        *(_current(f'IRMS{n}', f'Courant efficace, phase {n}') for n in PHASES),
+        *(_voltage(f'URMS{n}', f'Tension efficace, phase {n}') for n in PHASES),
+        # Apparent powers in kVA, which no device class accepts
+        _measurement('PREF', 'Puissance app. de référence', None, 'kVA', 'mdi:current-ac'),
+        _measurement('PCOUP', 'Puissance app. de coupure', None, 'kVA', 'mdi:current-ac'),
+        _apparent_power('SINSTS', 'Puissance app. instantanée soutirée'),
+        *(_apparent_power(f'SINSTS{n}', f'Puissance app. instantanée soutirée, phase {n}')
+          for n in PHASES),
+        _apparent_power('SMAXSN', 'Puissance app. max. soutirée n'),
+        *(_apparent_power(f'SMAXSN{n}', f'Puissance app. max. soutirée n, phase {n}')
+          for n in PHASES),
+        _apparent_power('SMAXSN-1', 'Puissance app. max. soutirée n-1'),
+        *(_apparent_power(f'SMAXSN{n}-1', f'Puissance app. max. soutirée n-1, phase {n}')
+          for n in PHASES),
+        _apparent_power('SINSTI', 'Puissance app. instantanée injectée'),
+        _apparent_power('SMAXIN', 'Puissance app. max. injectée n'),
+        _apparent_power('SMAXIN-1', 'Puissance app. max. injectée n-1'),
+        _measurement('CCASN', 'Point n de la courbe de charge active soutirée',
+                     SensorDeviceClass.POWER, UnitOfPower.WATT, 'mdi:flash'),
+        _measurement('CCASN-1', 'Point n-1 de la courbe de charge active soutirée',
+                     SensorDeviceClass.POWER, UnitOfPower.WATT, 'mdi:flash'),
+        _measurement('CCAIN', 'Point n de la courbe de charge active injectée',
+                     SensorDeviceClass.POWER, UnitOfPower.WATT, 'mdi:flash'),
+        _measurement('CCAIN-1', 'Point n-1 de la courbe de charge active injectée',
+                     SensorDeviceClass.POWER, UnitOfPower.WATT, 'mdi:flash'),
+        *(_voltage(f'UMOY{n}', f'Tension moy., phase {n}') for n in PHASES),
+        _string('STGE', 'Registre de statuts', attributes=converters.stge),
+        *(_string(f'DPM{n}', f'Début pointe mobile {n}') for n in PHASES),
+        *(_string(f'FPM{n}', f'Fin pointe mobile {n}') for n in PHASES),
+        _string('MSG1', 'Message court', converter=converters.text),
+        _string('MSG2', 'Message ultra court', converter=converters.text),
+        _string('PRM', 'PRM', 'mdi:eye'),
+        _integer('RELAIS', 'Relais'),
+        _integer('NTARF', 'Numéro de l\'index tarifaire en cours'),
+        _integer('NJOURF', 'Numéro du jour en cours calendrier fournisseur'),
+        _integer('NJOURF+1', 'Numéro du prochain jour calendrier fournisseur'),
+        _string('PJOURF+1', 'Profil du prochain jour calendrier fournisseur',
+                attributes=converters.schedule),
+        _string('PPOINTE', 'Profil du prochain jour de pointe', attributes=converters.schedule),
+    ],
+}
+
+# Label identifying the meter in each TIC mode.
+TELEINFO_METER_ID_KEYS = {
+    TIC_MODE_HISTORICAL: 'ADCO',
+    TIC_MODE_STANDARD: 'PRM',
+}
+
+# Labels only sent by the three-phase meters and by the producer meters, the
+# profile of a meter is detected from the labels of its first frame.
+TELEINFO_THREE_PHASE_KEYS = {
+    TIC_MODE_HISTORICAL: 'IINST3',
+    TIC_MODE_STANDARD: 'URMS3',
+}
+TELEINFO_PRODUCER_KEYS = {
+    TIC_MODE_STANDARD: 'EAIT',
+}
+
+# Label index of each TIC mode, keyed by the raw label bytes of the groups.
+TELEINFO_LABELS: Mapping[str, Mapping[bytes, TeleinfoLabel]] = MappingProxyType({
+    ticmode: MappingProxyType({label.key.encode('ascii'): label for label in labels})
+    for ticmode, labels in TELEINFO_ENTITIES.items()
+})
+
+# Instantaneous labels published on each frame in live mode.
+TELEINFO_LIVE_KEYS = {
+    TIC_MODE_HISTORICAL: (
+        'PAPP', 'IINST', *(f'IINST{n}' for n in PHASES),
+    ),
+    TIC_MODE_STANDARD: (
+        'SINSTS', *(f'SINSTS{n}' for n in PHASES),
+        *(f'IRMS{n}' for n in PHASES),
+        *(f'URMS{n}' for n in PHASES),
+    ),
+}
+
+TELEINFO_LIVE_LABELS: Mapping[str, Mapping[bytes, TeleinfoLabel]] = MappingProxyType({
+    ticmode: MappingProxyType({
+        key.encode('ascii'): TELEINFO_LABELS[ticmode][key.encode('ascii')] for key in keys
+    })
+    for ticmode, keys in TELEINFO_LIVE_KEYS.items()
+})
+
+# Numeric labels aggregated over each refresh window.
+TELEINFO_MEASUREMENT_LABELS: Mapping[str, Mapping[bytes, TeleinfoLabel]] = MappingProxyType({
+    ticmode: MappingProxyType({
+        raw: label for raw, label in labels.items()
+        if label.state_class == SensorStateClass.MEASUREMENT
+    })
+    for ticmode, labels in TELEINFO_LABELS.items()
+})
+
+# Numeric labels kept in the history.
+TELEINFO_NUMERIC_LABELS: Mapping[str, Mapping[bytes, TeleinfoLabel]] = MappingProxyType({
+    ticmode: MappingProxyType({
+        raw: label for raw, label in labels.items() if label.state_class is not None
+    })
+    for ticmode, labels in TELEINFO_LABELS.items()
+})
+
+TELEINFO_DIAGNOSTIC_ENTITIES = [
+    TeleinfoDiagnosticDescription(key='frames_received', name='Trames reçues'),
+    TeleinfoDiagnosticDescription(key='invalid_frames', name='Trames avec erreur de checksum'),
+    TeleinfoDiagnosticDescription(key='invalid_groups', name='Groupes avec erreur de checksum'),
+    TeleinfoDiagnosticDescription(key='reconnections', name='Reconnexions'),
+    TeleinfoDiagnosticDescription(
+        key='outage_duration',
+        name='Durée de coupure',
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+    ),
+    TeleinfoDiagnosticDescription(
+        key='skipped_refreshes',
+        name='Rafraîchissements sans nouvelle trame',
+        source='coordinator',
+    ),
+    TeleinfoDiagnosticDescription(
+        key='rejected_values',
+        name='Index d\'énergie rejetés',
+        source='coordinator',
+    ),
+    TeleinfoDiagnosticDescription(
+        key='live_frames',
+        name='Trames publiées en temps réel',
+        source='coordinator',
+        live=True,
+    ),
+    TeleinfoDiagnosticDescription(
+        key='live_latency',
+        name='Latence temps réel',
+        source='coordinator',
+        live=True,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    ),
+    _statistic('dropped_frames', 'Trames interrompues'),
+    _statistic(
+        'byte_rate',
+        'Débit reçu',
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DATA_RATE,
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+    ),
+    _mean_duration('parse_time', 'Temps moyen d\'analyse'),
+    _mean_duration('loop_lag', 'Retard moyen de la boucle d\'événements'),
+    _mean_duration('state_latency', 'Temps moyen de publication', 'coordinator'),
+    _statistic('state_writes', 'Écritures d\'état', 'coordinator'),
+    _statistic('skipped_writes', 'Écritures d\'état évitées', 'coordinator'),
+]
@@ -0,0 +1,108 @@
+"""Decoders of the structured TIC labels.
+
+The catalog references these functions once per label, and the entities only
+call them when the raw value of their label changes. The decoders of values
+repeated frame after frame are cached on the raw value.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Period in progress of the historical mode, PTEC without its padding dots.
+PTEC_OPTIONS = [
+    'th', 'hc', 'hp', 'hn', 'pm',
+    'hcjb', 'hpjb', 'hcjw', 'hpjw', 'hcjr', 'hpjr',
+]
+
+# Tomorrow's Tempo colour of the historical mode.
+DEMAIN_OPTIONS = {
+    '----': 'inconnue',
+    'BLEU': 'bleu',
+    'BLAN': 'blanc',
+    'ROUG': 'rouge',
+}
+
+# State of the cut-off device, STGE bits 1 to 3.
+_BREAKER_STATES = (
+    'closed',
+    'open_overpower',
+    'open_overvoltage',
+    'open_load_shedding',
+    'open_cpl_command',
+    'open_overheating_above_imax',
+    'open_overheating_below_imax',
+)
+
+# Tempo colours, STGE bits 24 to 27.
+_TEMPO_COLOURS = (None, 'blue', 'white', 'red')
+
+
+def ptec(raw: str) -> str | None:
+    """Return the option of a period in progress, None if it is unknown."""
+    option = raw.rstrip('.').lower()
+    if option not in PTEC_OPTIONS:
+        _LOGGER.debug("Unknown period in progress: %r", raw)
+        return None
+    return option
+
+
+def demain(raw: str) -> str | None:
+    """Return the option of tomorrow's colour, None if it is unknown."""
+    return DEMAIN_OPTIONS.get(raw)
+
+
+def text(raw: str) -> str:
+    """Return a padded free text, LTARF, NGTF or MSG1/2, without its padding."""
+    return ' '.join(raw.split())
+
+
+@lru_cache(maxsize=8)
+def stge(raw: str) -> dict[str, Any]:
+    """Return the status fields of a STGE register."""
+    bits = int(raw, 16)
+    breaker = bits >> 1 & 0x07
+    return {
+        'dry_contact_open': bool(bits & 1),
+        'breaker': _BREAKER_STATES[breaker] if breaker < len(_BREAKER_STATES) else None,
+        'terminal_cover_open': bool(bits >> 4 & 1),
+        'overvoltage': bool(bits >> 6 & 1),
+        'reference_power_exceeded': bool(bits >> 7 & 1),
+        'producer': bool(bits >> 8 & 1),
+        'negative_active_energy': bool(bits >> 9 & 1),
+        'supplier_index': (bits >> 10 & 0x0F) + 1,
+        'distributor_index': (bits >> 14 & 0x03) + 1,
+        'clock_degraded': bool(bits >> 16 & 1),
+        'standard_mode': bool(bits >> 17 & 1),
+        'euridis': bits >> 19 & 0x03,
+        'cpl_status': bits >> 21 & 0x03,
+        'cpl_synchronized': bool(bits >> 23 & 1),
+        'tempo_today': _TEMPO_COLOURS[bits >> 24 & 0x03],
+        'tempo_tomorrow': _TEMPO_COLOURS[bits >> 26 & 0x03],
+        'mobile_peak_notice': bits >> 28 & 0x03,
+        'mobile_peak': bits >> 30 & 0x03,
+    }
+
+
+@lru_cache(maxsize=8)
+def schedule(raw: str) -> dict[str, Any]:
+    """Return the switch times of a day profile, PJOURF+1 or PPOINTE.
+
+    The profile is made of up to 11 HHMMSSSS blocks, a start time and an
+    action code whose 4 low bits are the supplier index, unused blocks are
+    NONUTILE.
+    """
+    blocks = []
+    for block in raw.split():
+        if block == 'NONUTILE' or len(block) != 8:
+            continue
+        code = int(block[4:], 16)
+        blocks.append({
+            'start': f"{block[:2]}:{block[2:4]}",
+            'index': code & 0x0F,
+            'code': block[4:],
+        })
+    return {'schedule': blocks}
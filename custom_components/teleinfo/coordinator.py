@@ -0,0 +1,413 @@
+"""Teleinfo data coordinator.
+
+The coordinator publishes the last frame kept by the reader on each refresh
+tick of the scheduler: it decodes the known labels of the frame once and calls the entities
+subscribed to each of them, instead of firing one bus event per group.
+
+Ticks are coalesced: a tick without a new frame since the previous one only
+updates the diagnostic entities and is counted as skipped.
+
+In live mode, the instantaneous labels are also decoded and dispatched as soon
+as each frame is received, the other labels stay on the refresh tick. With
+aggregates, the numeric labels of every frame are folded into running
+aggregates whose min, max, mean, last value and count are published on each
+tick, and with a history they are also kept for the last frames.
+
+The raw values of the last frame are saved, at most every SNAPSHOT_INTERVAL
+seconds, and served after a restart until the first frame is received, unless
+they were saved more than SNAPSHOT_MAX_AGE seconds ago.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+import datetime
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import (
+    DOMAIN,
+    EVENT_TELEINFO_FRAME,
+    TELEINFO_LABELS,
+    TELEINFO_LIVE_LABELS,
+    TELEINFO_MEASUREMENT_LABELS,
+    TELEINFO_NUMERIC_LABELS,
+    TELEINFO_METER_ID_KEYS,
+    TELEINFO_PRODUCER_KEYS,
+    TELEINFO_THREE_PHASE_KEYS,
+    TeleinfoLabel,
+)
+from .aggregate import WindowAggregate
+from .history import TeleinfoHistory
+from .horodate import decode_horodate
+from .parser import TeleinfoFrame
+from .reader import TeleinfoReader
+from .stats import TimingHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Deadline of the first refresh, the periodic ticks take over after it.
+FIRST_REFRESH_TIMEOUT = 60
+
+# Minimum interval between two saves of the snapshot of the last frame.
+SNAPSHOT_INTERVAL = 300
+SNAPSHOT_VERSION = 1
+# Maximum age of a snapshot served after a restart, in seconds.
+SNAPSHOT_MAX_AGE = 3600
+
+
+def decode_frame(
+    frame: TeleinfoFrame, labels: Mapping[bytes, TeleinfoLabel]
+) -> dict[str, tuple[str, datetime.datetime | None]]:
+    """Return the value and horodate of the known labels of a frame."""
+    data = {}
+    for group in frame:
+        label = labels.get(group.label)
+        if label is None:
+            continue
+        ts = None
+        if group.horodate is not None:
+            try:
+                ts = decode_horodate(group.horodate)
+            except ValueError:
+                _LOGGER.debug("Invalid horodate for %s: %r", label.key, group.horodate)
+        data[label.key] = (group.value.decode('ascii'), ts)
+    return data
+
+
+def _valid_snapshot(snapshot) -> bool:
+    """Return True if a loaded snapshot has the fields and types it is saved with."""
+    return (
+        isinstance(snapshot, dict)
+        and isinstance(snapshot.get("saved"), (int, float))
+        and isinstance(snapshot.get("meter_id"), str)
+        and isinstance(snapshot.get("keys"), list)
+        and all(isinstance(key, str) for key in snapshot["keys"])
+        and isinstance(snapshot.get("data"), dict)
+        and all(isinstance(value, str) for value in snapshot["data"].values())
+    )
+
+
+class TeleinfoCoordinator:
+    """Store the decoded frame and dispatch it to the entities by label."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        reader: TeleinfoReader,
+        ticmode: str,
+        refresh: datetime.timedelta,
+        fire_event: bool = False,
+        live: bool = False,
+        aggregate: bool = False,
+        history: int = 0,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.reader = reader
+        self.ticmode = ticmode
+        self.refresh = refresh
+        self._labels = TELEINFO_LABELS[ticmode]
+        self._meter_id_key = TELEINFO_METER_ID_KEYS[ticmode]
+        self._fire_event = fire_event
+        self._listeners: dict[str | None, list[CALLBACK_TYPE]] = {}
+        self._meter_listeners: list[Callable[[str], None]] = []
+        self._availability_listeners: list[CALLBACK_TYPE] = []
+        reader.availability_callback = self._async_availability_changed
+        self._live_labels: Mapping[bytes, TeleinfoLabel] = {}
+        self._live_keys: frozenset[str] = frozenset()
+        self.live = live
+        if live:
+            self._live_labels = TELEINFO_LIVE_LABELS[ticmode]
+            self._live_keys = frozenset(label.key for label in self._live_labels.values())
+        self._numeric_labels: Mapping[bytes, TeleinfoLabel] = {}
+        self._aggregate_keys: frozenset[str] = frozenset()
+        if aggregate:
+            self._numeric_labels = TELEINFO_MEASUREMENT_LABELS[ticmode]
+            self._aggregate_keys = frozenset(
+                label.key for label in self._numeric_labels.values()
+            )
+        self.history: TeleinfoHistory | None = None
+        if history:
+            self._numeric_labels = TELEINFO_NUMERIC_LABELS[ticmode]
+            self.history = TeleinfoHistory(history)
+        self._windows: dict[str, WindowAggregate] = {}
+        if live or self._numeric_labels:
+            reader.frame_callback = self._async_on_frame
+        self._frame: TeleinfoFrame = ()
+        self.meter_id: str | None = None
+        # Labels sent by the meter, and its profile
+        self.sent_keys: set[str] = set()
+        self._keys_listeners: list[Callable[[set[str]], None]] = []
+        self.three_phase = False
+        self.producer = False
+        self.skipped_refreshes = 0
+        self.rejected_values = 0
+        self.state_writes = 0
+        self.skipped_writes = 0
+        # Time from the start of a refresh tick, and from the reception of a
+        # frame in live mode, to the state writes of its labels
+        self.state_latency = TimingHistogram()
+        self.live_state_latency = TimingHistogram()
+        self.live_frames = 0
+        self.live_latency: float | None = None
+        # Time from the start of the reader to the first refresh, in seconds
+        self.startup_time: float | None = None
+        # True while the data is the snapshot restored from the previous run
+        self.restored = False
+        self._store: Store[dict] = Store(
+            hass, SNAPSHOT_VERSION, f"{DOMAIN}.{slugify(reader.port)}"
+        )
+        self._snapshot_pending = False
+        self.aggregates: dict[str, dict[str, int | float]] = {}
+        self.data: dict[str, tuple[str, datetime.datetime | None]] = {}
+
+    @callback
+    def async_add_listener(self, key: str | None, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Call update_callback when key is received, or on each refresh if key is None."""
+        listeners = self._listeners.setdefault(key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._listeners[key]
+
+        return remove_listener
+
+    @callback
+    def async_add_meter_listener(self, meter_callback: Callable[[str], None]) -> None:
+        """Call meter_callback with the meter identifier once it is known."""
+        if self.meter_id is not None:
+            meter_callback(self.meter_id)
+        else:
+            self._meter_listeners.append(meter_callback)
+
+    @callback
+    def async_add_keys_listener(self, keys_callback: Callable[[set[str]], None]) -> None:
+        """Call keys_callback with the labels sent by the meter, then with the new ones."""
+        if self.sent_keys:
+            keys_callback(set(self.sent_keys))
+        self._keys_listeners.append(keys_callback)
+
+    @callback
+    def async_add_availability_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Call update_callback when the reader is connected or disconnected."""
+        self._availability_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._availability_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @property
+    def available(self) -> bool:
+        """Return True while the reader receives valid frames, or serves the snapshot."""
+        return self.reader.available or self.restored
+
+    @callback
+    def _async_availability_changed(self, available: bool) -> None:
+        """Notify the entities that the meter became available or unavailable."""
+        if self.meter_id is None:
+            return
+        if available:
+            _LOGGER.info("Meter %s is available again", self.meter_id)
+        else:
+            _LOGGER.info("Meter %s is unavailable", self.meter_id)
+        for update_callback in list(self._availability_listeners):
+            update_callback()
+
+    async def async_first_refresh(self) -> None:
+        """Refresh as soon as the first frame is received."""
+        start = time.monotonic()
+        await self._async_restore()
+        try:
+            async with asyncio.timeout(FIRST_REFRESH_TIMEOUT):
+                await self.reader.frame_received.wait()
+        except TimeoutError:
+            _LOGGER.warning(
+                "No frame received within %d s, waiting for the next refresh",
+                FIRST_REFRESH_TIMEOUT,
+            )
+            if self.restored:
+                self.restored = False
+                self._async_availability_changed(self.reader.available)
+            return
+        self.async_refresh()
+        self.startup_time = round(time.monotonic() - start, 3)
+        _LOGGER.debug("First frame of %s published after %.3f s", self.reader.port, self.startup_time)
+
+    async def _async_restore(self) -> None:
+        """Serve the snapshot of the previous run until the first frame is received."""
+        snapshot = await self._store.async_load()
+        if not snapshot or self.reader.frame:
+            return
+        if not _valid_snapshot(snapshot):
+            _LOGGER.warning("Ignoring the invalid snapshot of %s", self.reader.port)
+            return
+        age = time.time() - snapshot["saved"]
+        if age > SNAPSHOT_MAX_AGE:
+            _LOGGER.debug("Ignoring the snapshot of %s saved %d s ago", self.reader.port, age)
+            return
+        self.restored = True
+        self.data = {key: (value, None) for key, value in snapshot["data"].items()}
+        self.sent_keys.update(snapshot["keys"])
+        _LOGGER.debug("Restored %d labels of meter %s", len(self.data), snapshot["meter_id"])
+        self._async_set_meter_id(snapshot["meter_id"])
+
+    @callback
+    def _async_set_meter_id(self, meter_id: str) -> None:
+        """Identify the meter, detect its profile and create its entities."""
+        self.meter_id = meter_id
+        _LOGGER.debug("Identified meter %s", meter_id)
+        self._detect_profile()
+        for meter_callback in self._meter_listeners:
+            meter_callback(meter_id)
+        self._meter_listeners.clear()
+
+    def _detect_profile(self) -> bool:
+        """Detect the profile of the meter from its labels, return True if it changed."""
+        three_phase = TELEINFO_THREE_PHASE_KEYS[self.ticmode] in self.sent_keys
+        producer = TELEINFO_PRODUCER_KEYS.get(self.ticmode) in self.sent_keys
+        if (three_phase, producer) == (self.three_phase, self.producer):
+            return False
+        self.three_phase = three_phase
+        self.producer = producer
+        _LOGGER.debug(
+            "Meter %s three-phase: %s, producer: %s", self.meter_id, three_phase, producer
+        )
+        return True
+
+    def _snapshot(self) -> dict:
+        """Return the meter identifier and the raw values of the last frame."""
+        self._snapshot_pending = False
+        return {
+            "saved": time.time(),
+            "meter_id": self.meter_id,
+            "keys": sorted(self.sent_keys),
+            "data": {key: value for key, (value, _) in self.data.items()},
+        }
+
+    async def async_save_snapshot(self) -> None:
+        """Save the snapshot now if the last frame is not saved yet."""
+        if self._snapshot_pending:
+            await self._store.async_save(self._snapshot())
+
+    @callback
+    def async_refresh(self) -> None:
+        """Decode the last frame and notify the subscribed entities."""
+        start = time.monotonic()
+        frame = self.reader.frame
+        if not frame:
+            _LOGGER.debug("No complete frame received yet")
+            self.skipped_refreshes += 1
+        elif frame is self._frame:
+            _LOGGER.debug("No new frame since the last refresh")
+            self.skipped_refreshes += 1
+        else:
+            self._frame = frame
+            data = decode_frame(frame, self._labels)
+            self.data = data
+            self.restored = False
+            identified = self.meter_id is not None
+            new_keys = data.keys() - self.sent_keys
+            self.sent_keys.update(new_keys)
+
+            if self._windows:
+                self.aggregates = {
+                    key: window.summary() for key, window in self._windows.items() if window.count
+                }
+                for window in self._windows.values():
+                    window.clear()
+
+            if self._meter_id_key in data:
+                meter_id = data[self._meter_id_key][0].strip()
+                if self.meter_id is None:
+                    self._async_set_meter_id(meter_id)
+                elif meter_id != self.meter_id:
+                    # Only after a restore, the entities are created on the next start
+                    _LOGGER.warning(
+                        "Meter %s replaced meter %s on %s, restart Home Assistant to"
+                        " create its entities", meter_id, self.meter_id, self.reader.port,
+                    )
+                    self.meter_id = meter_id
+
+            # Labels sent for the first time, such as the intermittent ADPS or PEJP
+            if identified and new_keys:
+                _LOGGER.debug("Meter %s sent new labels %s", self.meter_id, new_keys)
+                # A label of the profile may have been lost to a checksum error
+                self._detect_profile()
+                for keys_callback in self._keys_listeners:
+                    keys_callback(new_keys)
+
+            # The store writes the snapshot in the executor, at most once per interval
+            if self.meter_id is not None and not self._snapshot_pending:
+                self._snapshot_pending = True
+                self._store.async_delay_save(self._snapshot, SNAPSHOT_INTERVAL)
+
+            if self._fire_event:
+                self.hass.bus.async_fire(
+                    EVENT_TELEINFO_FRAME,
+                    {
+                        "meter_id": self.meter_id,
+                        "values": {key: value for key, (value, _) in data.items()},
+                        "timestamps": {key: ts for key, (_, ts) in data.items() if ts is not None},
+                    },
+                )
+
+            # The live labels are only dispatched here for their aggregates
+            keys = data.keys() - self._live_keys | self.aggregates.keys()
+            for key in keys & self._listeners.keys():
+                for update_callback in list(self._listeners[key]):
+                    update_callback()
+            # Not from the reception of the frame, which waits up to a refresh interval
+            self.state_latency.add(time.monotonic() - start)
+
+        for update_callback in list(self._listeners.get(None, ())):
+            update_callback()
+
+    @callback
+    def _async_on_frame(self, frame: TeleinfoFrame) -> None:
+        """Fold a frame into the aggregates and history and publish its live labels."""
+        if self._numeric_labels:
+            values = self._numeric_values(frame)
+            for key in values.keys() & self._aggregate_keys:
+                window = self._windows.get(key)
+                if window is None:
+                    window = self._windows[key] = WindowAggregate()
+                window.append(values[key])
+            if self.history is not None:
+                self.history.append(time.time(), values)
+        if self._live_labels and self.meter_id is not None:
+            self._live_update(frame)
+
+    def _numeric_values(self, frame: TeleinfoFrame) -> dict[str, int]:
+        """Return the converted values of the numeric labels of a frame."""
+        values = {}
+        for group in frame:
+            label = self._numeric_labels.get(group.label)
+            if label is None:
+                continue
+            try:
+                values[label.key] = label.converter(group.value)
+            except ValueError:
+                continue
+        return values
+
+    def _live_update(self, frame: TeleinfoFrame) -> None:
+        """Decode the live labels of a frame and notify their entities at once."""
+        data = decode_frame(frame, self._live_labels)
+        self.data.update(data)
+        for key in data.keys() & self._listeners.keys():
+            for update_callback in list(self._listeners[key]):
+                update_callback()
+        latency = time.monotonic() - self.reader.frame_time
+        self.live_frames += 1
+        self.live_latency = round(latency * 1000, 2)
+        self.live_state_latency.add(latency)
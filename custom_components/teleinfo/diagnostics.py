@@ -0,0 +1,71 @@
+"""Diagnostics support for Teleinfo."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import TeleinfoCoordinator
+from .scheduler import async_get_scheduler
+
+TO_REDACT = {"meter_id", "port"}
+
+
+def _async_coordinator_diagnostics(coordinator: TeleinfoCoordinator) -> dict[str, Any]:
+    """Return the counters and timings of a meter."""
+    reader = coordinator.reader
+    return {
+        "meter_id": coordinator.meter_id,
+        "port": reader.port,
+        "ticmode": coordinator.ticmode,
+        "three_phase": coordinator.three_phase,
+        "producer": coordinator.producer,
+        "sent_keys": sorted(coordinator.sent_keys),
+        "refresh": coordinator.refresh.total_seconds(),
+        "available": reader.available,
+        "reader": {
+            "frames_received": reader.frames_received,
+            "dropped_frames": reader.dropped_frames,
+            "invalid_frames": reader.invalid_frames,
+            "invalid_groups": reader.invalid_groups,
+            "reconnections": reader.reconnections,
+            "outage_duration": reader.outage_duration,
+            "bytes_received": reader.bytes_received,
+            "byte_rate": reader.byte_rate,
+            "bytes_captured": reader.bytes_captured,
+            "parse_time": reader.parse_time.as_dict(),
+            "loop_lag": reader.loop_lag.as_dict(),
+        },
+        "coordinator": {
+            "skipped_refreshes": coordinator.skipped_refreshes,
+            "rejected_values": coordinator.rejected_values,
+            "state_writes": coordinator.state_writes,
+            "skipped_writes": coordinator.skipped_writes,
+            "live_frames": coordinator.live_frames,
+            "startup_time": coordinator.startup_time,
+            "restored": coordinator.restored,
+            "state_latency": coordinator.state_latency.as_dict(),
+            "live_state_latency": coordinator.live_state_latency.as_dict(),
+        },
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of the meter of the entry, or of all the YAML meters."""
+    if entry.entry_id in hass.data.get(DOMAIN, {}):
+        coordinators = [hass.data[DOMAIN][entry.entry_id]]
+    else:
+        coordinators = async_get_scheduler(hass).coordinators
+    return async_redact_data(
+        {
+            "meters": [
+                _async_coordinator_diagnostics(coordinator) for coordinator in coordinators
+            ],
+        },
+        TO_REDACT,
+    )
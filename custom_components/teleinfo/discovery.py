@@ -0,0 +1,121 @@
+"""Teleinfo dongle detection and validation.
+
+Globbing the device nodes and opening serial ports are blocking calls, so they
+run in the executor, with a deadline, and never on the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import glob
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .checksum import validate_frame
+from .const import TIC_MODE_HISTORICAL, TIC_MODE_STANDARD
+from .parser import HT, SP, TeleinfoFrameParser
+
+_LOGGER = logging.getLogger(__name__)
+
+DETECT_GLOBS = [
+    "/dev/tty*",
+    "/dev/serial/by-id/*",
+]
+DETECT_TIMEOUT = 5
+DETECT_CACHE_TTL = 30
+
+# A frame lasts up to about 2 s in historical mode, listen for two of them.
+# The baud rate is only needed to receive a frame, network sources ignore it
+# and the TIC mode is told by the separator of the frame groups.
+TIC_MODE_SEPARATORS = {
+    SP: TIC_MODE_HISTORICAL,
+    HT: TIC_MODE_STANDARD,
+}
+TIC_MODE_BAUDRATES = {
+    TIC_MODE_STANDARD: 9600,
+    TIC_MODE_HISTORICAL: 1200,
+}
+VALIDATE_TIMEOUT = {
+    TIC_MODE_STANDARD: 3,
+    TIC_MODE_HISTORICAL: 5,
+}
+
+_detect_cache: tuple[float, list[str]] | None = None
+
+
+def _detect() -> list[str]:
+    """Return a list of candidate paths for USB Teleinfo dongles.
+
+    This method is currently a bit simplistic, it may need to be
+    improved to support more configurations and OS.
+    """
+    found_paths = []
+    for current_glob in DETECT_GLOBS:
+        found_paths.extend(glob.glob(current_glob))
+
+    return found_paths
+
+
+async def async_detect(hass: HomeAssistant) -> list[str]:
+    """Return the candidate dongle paths, cached for a short while."""
+    global _detect_cache
+
+    now = time.monotonic()
+    if _detect_cache is not None and now - _detect_cache[0] < DETECT_CACHE_TTL:
+        return list(_detect_cache[1])
+
+    try:
+        async with asyncio.timeout(DETECT_TIMEOUT):
+            found_paths = await hass.async_add_executor_job(_detect)
+    except TimeoutError:
+        _LOGGER.warning("Timeout while looking for Teleinfo dongles")
+        return []
+
+    _detect_cache = (now, found_paths)
+    return list(found_paths)
+
+
+def _listen(path: str, baudrate: int, timeout: float) -> str | None:
+    """Return the TIC mode of the first valid frame received on path before timeout."""
+    # Imported here, in the executor, to keep pyserial out of the startup
+    import serial  # pylint: disable=import-outside-toplevel
+
+    parser = TeleinfoFrameParser()
+    deadline = time.monotonic() + timeout
+    with serial.serial_for_url(
+        url=path,
+        baudrate=baudrate,
+        bytesize=serial.SEVENBITS,
+        parity=serial.PARITY_EVEN,
+        stopbits=serial.STOPBITS_ONE,
+        timeout=0.2,
+    ) as port:
+        while time.monotonic() < deadline:
+            data = port.read(port.in_waiting or 1)
+            for frame in parser.feed(data):
+                groups, invalid = validate_frame(frame)
+                if groups and not invalid:
+                    return TIC_MODE_SEPARATORS[groups[0].separator]
+    return None
+
+
+async def async_validate_path(hass: HomeAssistant, path: str) -> str | None:
+    """Return the TIC mode of the meter sending frames on path, None if there is none."""
+    for baudrate_mode, baudrate in TIC_MODE_BAUDRATES.items():
+        timeout = VALIDATE_TIMEOUT[baudrate_mode]
+        try:
+            async with asyncio.timeout(timeout + 1):
+                ticmode = await hass.async_add_executor_job(_listen, path, baudrate, timeout)
+        except TimeoutError:
+            ticmode = None
+        except OSError as exception:
+            # serial.SerialException is an OSError
+            _LOGGER.warning("Serial path %s is invalid: %s", path, str(exception))
+            return None
+        if ticmode is not None:
+            _LOGGER.debug("Found a Teleinfo %s mode meter on %s", ticmode, path)
+            return ticmode
+
+    _LOGGER.warning("No Teleinfo frame received on %s", path)
+    return None
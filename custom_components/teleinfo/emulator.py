@@ -0,0 +1,219 @@
+"""Teleinfo meter emulator on a pseudo-terminal.
+
+The emulator streams realistic historical or standard frames on a pty, at the
+meter byte rate, so that the reader, its reconnections and the config flow
+detection can be exercised on any Linux box without a meter:
+
+    python -m custom_components.teleinfo.emulator --mode standard --profile daily \\
+        --noise 0.0001 --dropout 0.01 --link /tmp/ttyTIC
+
+The apparent power follows a load profile, line noise flips random bits and
+dropouts either interrupt a frame with EOT or leave the line silent.
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import logging
+import math
+import os
+import random
+import threading
+import tty
+
+from .const import TIC_MODE_STANDARD
+from .replay import BYTE_RATE, SAMPLE_GROUPS, sample_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+EOT = b'\x04'
+
+# Interval at which the rest of a partly written frame is written again.
+WRITE_RETRY_INTERVAL = 0.01
+
+# Apparent power in VA of the number-th frame, elapsed seconds in the
+# emulated day and a random generator.
+LoadProfile = Callable[[int, float, random.Random], int]
+
+LOAD_PROFILES: dict[str, LoadProfile] = {
+    'constant': lambda number, elapsed, rng: 1500,
+    'random': lambda number, elapsed, rng: rng.randrange(100, 9000),
+    'daily': lambda number, elapsed, rng: int(
+        2500 - 2000 * math.cos(2 * math.pi * elapsed / 86400) + rng.randrange(0, 300)
+    ),
+    'steps': lambda number, elapsed, rng: 6000 if number // 30 % 2 else 400,
+}
+
+
+class TeleinfoEmulator:
+    """Stream synthetic TIC frames on a pseudo-terminal."""
+
+    def __init__(
+        self,
+        ticmode: str = TIC_MODE_STANDARD,
+        labels: list[str] | None = None,
+        profile: str = 'constant',
+        noise: float = 0.0,
+        dropout: float = 0.0,
+        speed: float = 1.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the emulator.
+
+        labels restricts the sample groups of the mode, noise is the
+        probability of a bit flip per byte, dropout the probability of a
+        dropout per frame, speed a factor of the meter byte rate, 0 for as
+        fast as the port is read.
+        """
+        if speed < 0:
+            raise ValueError(f"Invalid speed {speed}")
+        self._ticmode = ticmode
+        self._groups = [
+            group for group in SAMPLE_GROUPS[ticmode] if labels is None or group[0] in labels
+        ]
+        self._profile = LOAD_PROFILES[profile]
+        self._noise = noise
+        self._dropout = dropout
+        self._byte_rate = BYTE_RATE[ticmode] * speed
+        self._rng = random.Random(seed)
+        self._master: int | None = None
+        self._slave: int | None = None
+        self._link: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.frames_sent = 0
+
+    def open(self, link: str | None = None) -> str:
+        """Create the pty and return the path of the port, or of its symlink."""
+        self._master, self._slave = os.openpty()
+        os.set_blocking(self._master, False)
+        tty.setraw(self._slave)
+        path = os.ttyname(self._slave)
+        if link is not None:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(path, link)
+            self._link = path = link
+        return path
+
+    def close(self) -> None:
+        """Stop streaming and remove the pty."""
+        self.stop()
+        if self._link is not None:
+            os.unlink(self._link)
+            self._link = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def frame(self, number: int, elapsed: float) -> bytes:
+        """Return the number-th frame, with line noise."""
+        power = max(self._profile(number, elapsed, self._rng), 0)
+        frame = sample_frame(self._ticmode, number, power, self._groups)
+        if self._noise:
+            for index in range(len(frame)):
+                if self._rng.random() < self._noise:
+                    frame[index] ^= 1 << self._rng.randrange(7)
+        return bytes(frame)
+
+    def run(self, count: int | None = None) -> None:
+        """Write frames on the pty until stopped, or count frames were sent."""
+        # Emulated time, the time the meter takes to send the bytes so far
+        elapsed = 0.0
+        number = 0
+        while not self._stop.is_set() and (count is None or number < count):
+            frame = self.frame(number, elapsed % 86400)
+            number += 1
+            elapsed += len(frame) / BYTE_RATE[self._ticmode]
+            if self._rng.random() < self._dropout:
+                if self._rng.random() < 0.5:
+                    _LOGGER.debug("Interrupting frame %d", number)
+                    frame = frame[:self._rng.randrange(1, len(frame))] + EOT
+                else:
+                    _LOGGER.debug("Dropping frame %d", number)
+                    self._wait(len(frame))
+                    continue
+            if self._write(frame):
+                self.frames_sent += 1
+            self._wait(len(frame))
+
+    def _write(self, frame: bytes) -> bool:
+        """Write a whole frame on the pty, return False if it was dropped."""
+        offset = 0
+        while offset < len(frame) and not self._stop.is_set():
+            try:
+                offset += os.write(self._master, frame[offset:])
+            except BlockingIOError:
+                if not offset and self._byte_rate:
+                    # Nobody reads the port and its buffer is full
+                    return False
+                # The rest of a partly written frame must follow, and
+                # unthrottled frames wait for the reader
+                self._stop.wait(WRITE_RETRY_INTERVAL)
+        return offset == len(frame)
+
+    def _wait(self, size: int) -> None:
+        """Wait for the time the meter takes to send size bytes."""
+        if self._byte_rate:
+            self._stop.wait(size / self._byte_rate)
+
+    def start(self, count: int | None = None) -> None:
+        """Run the emulator in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(count,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _speed(value: str) -> float:
+    """Return a speed factor, positive or 0."""
+    speed = float(value)
+    if speed < 0:
+        raise argparse.ArgumentTypeError(f"invalid speed {value}, it must not be negative")
+    return speed
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the emulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=list(SAMPLE_GROUPS), default=TIC_MODE_STANDARD)
+    parser.add_argument('--labels', help="comma separated labels to send, all by default")
+    parser.add_argument('--profile', choices=list(LOAD_PROFILES), default='constant')
+    parser.add_argument('--noise', type=float, default=0.0,
+                        help="probability of a bit flip per byte")
+    parser.add_argument('--dropout', type=float, default=0.0,
+                        help="probability of a dropout per frame")
+    parser.add_argument('--speed', type=_speed, default=1.0,
+                        help="factor of the meter byte rate, 0 for as fast as possible")
+    parser.add_argument('--frames', type=int, help="number of frames to send")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--link', help="symlink to create to the emulated port")
+    args = parser.parse_args(argv)
+
+    emulator = TeleinfoEmulator(
+        args.mode,
+        args.labels.split(',') if args.labels else None,
+        args.profile,
+        args.noise,
+        args.dropout,
+        args.speed,
+        args.seed,
+    )
+    print(f"Emulating a {args.mode} mode meter on {emulator.open(args.link)}", flush=True)
+    try:
+        emulator.run(args.frames)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""In-memory history of the numeric labels of the last frames.
+
+The history keeps the last frames in typed arrays sharing one write index: an
+array of timestamps and one array of 32 bit integers per numeric label, so
+that 24 h of frames of a standard meter fit in a few megabytes.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+# 24 h of frames at about 1.5 s, and at most 3 days, the arrays are allocated
+# at once.
+DEFAULT_HISTORY_SIZE = 57600
+MAX_HISTORY_SIZE = 3 * DEFAULT_HISTORY_SIZE
+
+# Value of a label which was not in a frame, or whose value does not fit in
+# the 32 bit arrays.
+MISSING = -(2 ** 31)
+MAX_VALUE = 2 ** 31 - 1
+
+
+def _fit(value: int) -> int:
+    """Return value, or MISSING if it does not fit in 32 bits."""
+    return value if MISSING < value <= MAX_VALUE else MISSING
+
+
+class TeleinfoHistory:
+    """Ring buffer of the timestamped numeric values of the last frames."""
+
+    def __init__(self, size: int = DEFAULT_HISTORY_SIZE) -> None:
+        """Initialize the history."""
+        self._size = size
+        self._times = array('d', bytes(size * 8))
+        self._series: dict[str, array] = {}
+        self._index = 0
+        self._count = 0
+
+    def append(self, timestamp: float, values: dict[str, int]) -> None:
+        """Add the numeric values of a frame received at timestamp."""
+        index = self._index
+        self._times[index] = timestamp
+        for key, series in self._series.items():
+            series[index] = _fit(values.get(key, MISSING))
+        for key in values.keys() - self._series.keys():
+            series = self._series[key] = array('i', (MISSING,)) * self._size
+            series[index] = _fit(values[key])
+        self._index = (index + 1) % self._size
+        self._count += 1
+
+    def _ordered(self, values: array) -> array:
+        """Return the kept values of an array from the oldest to the newest."""
+        if self._count < self._size:
+            return values[:self._index]
+        return values[self._index:] + values[:self._index]
+
+    def query(
+        self,
+        key: str,
+        since: float | None = None,
+        until: float | None = None,
+        resolution: float = 0,
+    ) -> list[tuple[float, float, int, int]]:
+        """Return the (time, mean, min, max) points of key between since and until.
+
+        With a resolution, in seconds, the values are downsampled to one point
+        per period, timestamped with its start.
+        """
+        series = self._series.get(key)
+        if series is None:
+            return []
+
+        times = self._ordered(self._times)
+        start = 0 if since is None else bisect_left(times, since)
+        end = len(times) if until is None else bisect_right(times, until)
+        values = self._ordered(series)
+
+        points = []
+        if not resolution:
+            for index in range(start, end):
+                value = values[index]
+                if value != MISSING:
+                    points.append((times[index], value, value, value))
+            return points
+
+        period = None
+        total = count = low = high = 0
+        for index in range(start, end):
+            value = values[index]
+            if value == MISSING:
+                continue
+            time = times[index]
+            if period is None or time >= period + resolution:
+                if count:
+                    points.append((period, round(total / count, 1), low, high))
+                period = time - time % resolution
+                total = count = 0
+                low = high = value
+            total += value
+            count += 1
+            low = min(low, value)
+            high = max(high, value)
+        if count:
+            points.append((period, round(total / count, 1), low, high))
+        return points
@@ -0,0 +1,49 @@
+"""Teleinfo horodate decoding.
+
+Standard mode groups may carry a fixed-width SAAMMJJhhmmss horodate where S is
+the season flag: E for summer time (UTC+2), H for winter time (UTC+1), in
+lower case when the meter clock is degraded, or a space when unknown.
+"""
+from __future__ import annotations
+
+import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+HORODATE_LENGTH = 13
+
+SUMMER_TIME = datetime.timezone(datetime.timedelta(hours=2))
+WINTER_TIME = datetime.timezone(datetime.timedelta(hours=1))
+METER_TIME_ZONE = ZoneInfo("Europe/Paris")
+
+_SEASONS = {
+    ord('E'): SUMMER_TIME,
+    ord('e'): SUMMER_TIME,
+    ord('H'): WINTER_TIME,
+    ord('h'): WINTER_TIME,
+    ord(' '): METER_TIME_ZONE,
+}
+
+
+@lru_cache(maxsize=32)
+def decode_horodate(raw: bytes) -> datetime.datetime:
+    """Return the timezone-aware datetime of a raw horodate.
+
+    Many groups of a frame share the same horodate, hence the cache.
+    """
+    if len(raw) != HORODATE_LENGTH or not raw[1:].isdigit():
+        raise ValueError(f"Invalid horodate {raw!r}")
+    tzinfo = _SEASONS.get(raw[0])
+    if tzinfo is None:
+        raise ValueError(f"Invalid horodate season {raw!r}")
+
+    # Two ASCII digits at a time: (d1 - 0x30) * 10 + (d2 - 0x30)
+    return datetime.datetime(
+        2000 + raw[1] * 10 + raw[2] - 0x210,
+        raw[3] * 10 + raw[4] - 0x210,
+        raw[5] * 10 + raw[6] - 0x210,
+        raw[7] * 10 + raw[8] - 0x210,
+        raw[9] * 10 + raw[10] - 0x210,
+        raw[11] * 10 + raw[12] - 0x210,
+        tzinfo=tzinfo,
+    )
@@ -0,0 +1,149 @@
+"""Incremental Teleinfo (TIC) frame parser.
+
+The parser is fed raw byte chunks as they come out of the serial port and
+returns the frames completed by each chunk. It works on bytes only, so it can
+be used and benchmarked without Home Assistant.
+
+A frame is delimited by STX (0x02) and ETX (0x03) and contains groups
+delimited by LF (0x0A) and CR (0x0D). In historical mode the fields of a group
+are separated by SP, in standard mode by HT, with an optional horodate field:
+
+    LF label SP value SP checksum CR
+    LF label HT [horodate HT] value HT checksum CR
+
+The separator is always the byte preceding the checksum, which is how both
+modes are told apart.
+"""
+from __future__ import annotations
+
+import logging
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+STX = 0x02
+ETX = 0x03
+EOT = 0x04
+LF = 0x0A
+CR = 0x0D
+HT = 0x09
+SP = 0x20
+
+# Guard against a line without any frame delimiter filling the buffer.
+MAX_FRAME_SIZE = 4096
+
+
+class TeleinfoGroup(NamedTuple):
+    """An information group of a TIC frame."""
+
+    label: bytes
+    value: bytes
+    horodate: bytes | None
+    checksum: int
+    separator: int
+    raw: bytes
+
+
+TeleinfoFrame = tuple[TeleinfoGroup, ...]
+
+
+def parse_group(raw: bytes) -> TeleinfoGroup | None:
+    """Parse a group stripped of its LF/CR delimiters, None if malformed."""
+    if len(raw) < 4:
+        return None
+    separator = raw[-2]
+    if separator == HT:
+        fields = raw[:-2].split(b'\t')
+    elif separator == SP:
+        fields = raw[:-2].split(b' ', 1)
+    else:
+        return None
+
+    if len(fields) == 2:
+        label, value = fields
+        horodate = None
+    elif len(fields) == 3:
+        label, horodate, value = fields
+    else:
+        return None
+    if not label:
+        return None
+    return TeleinfoGroup(label, value, horodate, raw[-1], separator, raw)
+
+
+def parse_frame(body: bytes) -> TeleinfoFrame:
+    """Parse the groups of a frame body stripped of its STX/ETX delimiters."""
+    groups = []
+    start = body.find(LF)
+    while start >= 0:
+        stop = body.find(CR, start + 1)
+        if stop < 0:
+            break
+        group = parse_group(body[start + 1:stop])
+        if group is None:
+            _LOGGER.debug("Dropping malformed group %r", body[start + 1:stop])
+        else:
+            groups.append(group)
+        start = body.find(LF, stop + 1)
+    return tuple(groups)
+
+
+class TeleinfoFrameParser:
+    """Stream parser turning raw byte chunks into frames."""
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._buffer = bytearray()
+        self._in_frame = False
+        self.dropped_frames = 0
+
+    def reset(self) -> None:
+        """Drop any partial frame, e.g. after a reconnection."""
+        self._buffer.clear()
+        self._in_frame = False
+
+    def feed(self, data: bytes) -> list[TeleinfoFrame]:
+        """Consume a chunk of bytes and return the frames it completed."""
+        frames = []
+        buffer = self._buffer
+        buffer += data
+        while True:
+            if not self._in_frame:
+                start = buffer.find(STX)
+                if start < 0:
+                    buffer.clear()
+                    break
+                del buffer[:start + 1]
+                self._in_frame = True
+
+            end = buffer.find(ETX)
+            restart = buffer.find(STX)
+            interrupted = buffer.find(EOT)
+            if 0 <= interrupted and (end < 0 or interrupted < end):
+                # The meter aborted the frame, wait for the next STX.
+                _LOGGER.debug("Frame interrupted by EOT")
+                self.dropped_frames += 1
+                del buffer[:interrupted + 1]
+                self._in_frame = False
+                continue
+            if 0 <= restart and (end < 0 or restart < end):
+                # Missed ETX: resync on the new frame start.
+                _LOGGER.debug("Dropping truncated frame")
+                self.dropped_frames += 1
+                del buffer[:restart]
+                self._in_frame = False
+                continue
+            if end < 0:
+                if len(buffer) > MAX_FRAME_SIZE:
+                    _LOGGER.debug("Dropping oversized frame")
+                    self.dropped_frames += 1
+                    buffer.clear()
+                    self._in_frame = False
+                break
+
+            with memoryview(buffer) as view:
+                body = view[:end].tobytes()
+            frames.append(parse_frame(body))
+            del buffer[:end + 1]
+            self._in_frame = False
+        return frames
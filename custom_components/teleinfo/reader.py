@@ -0,0 +1,462 @@
+"""Persistent Teleinfo serial reader.
+
+The reader keeps the serial port open for the lifetime of the integration and
+feeds the received bytes to the frame parser, which resynchronises on the
+STX/ETX frame delimiters, so that the entities only have to publish the last
+complete frame on each refresh tick.
+
+The port is reopened with an exponential backoff when it fails or when no
+valid frame is received anymore.
+
+Besides local serial ports, the port may be a socket://host:port TCP bridge
+(ser2net, ESP bridges), read by the event loop, or any other pyserial URL such
+as rfc2217://host:port, read in a thread.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+import importlib
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from types import ModuleType
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from .capture import TeleinfoCapture
+from .const import TIC_MODE_HISTORICAL, TIC_MODE_STANDARD
+from .checksum import validate_frame
+from .parser import TeleinfoFrame, TeleinfoFrameParser
+from .stats import TimingHistogram
+
+if TYPE_CHECKING:
+    import serial
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reconnection backoff, in seconds, doubled after each failed attempt.
+BACKOFF_MIN = 1
+BACKOFF_MAX = 300
+# Interval at which a missing port path is checked for reappearance.
+PORT_POLL_INTERVAL = 1
+
+# Read timeout of the ports read in a thread, and TCP keepalive of the
+# socket:// sources, in seconds.
+READ_TIMEOUT = 1
+KEEPALIVE_IDLE = 10
+KEEPALIVE_INTERVAL = 5
+
+# Period of the event loop lag samples and minimum window of the byte rate,
+# in seconds.
+LOOP_LAG_INTERVAL = 1
+RATE_WINDOW = 10
+
+# Approximate duration of a frame in each mode, the stream is restarted when
+# no valid frame has been received for WATCHDOG_FRAMES of them.
+FRAME_PERIOD = {
+    TIC_MODE_HISTORICAL: 3,
+    TIC_MODE_STANDARD: 2,
+}
+WATCHDOG_FRAMES = 5
+
+
+class TeleinfoReader:
+    """Long-lived reader holding the serial port open."""
+
+    def __init__(self, port: str, ticmode: str, capture: TeleinfoCapture | None = None) -> None:
+        """Initialize the reader, recording the received bytes to capture if any."""
+        self._port = port
+        self._ticmode = ticmode
+        self._capture = capture
+        self._task: asyncio.Task | None = None
+        self._last_frame = 0.0
+        self._outage_start: float | None = time.monotonic()
+        self._outage_duration = 0.0
+        self.availability_callback: Callable[[bool], None] | None = None
+        self.frame_callback: Callable[[TeleinfoFrame], None] | None = None
+        self.frame: TeleinfoFrame = ()
+        self.frame_time = 0.0
+        self.frame_received = asyncio.Event()
+        self.frames_received = 0
+        self.invalid_frames = 0
+        self.invalid_groups = 0
+        self.reconnections = 0
+        self.bytes_received = 0
+        self.parse_time = TimingHistogram()
+        self.loop_lag = TimingHistogram()
+        self._parser = TeleinfoFrameParser()
+        self._lag_timer: asyncio.TimerHandle | None = None
+        self._rate_sample = (time.monotonic(), 0)
+        self._byte_rate = 0.0
+
+    @property
+    def port(self) -> str:
+        """Return the path or URL of the port."""
+        return self._port
+
+    @property
+    def baudrate(self) -> int:
+        """Return the baud rate of the configured TIC mode."""
+        if self._ticmode == TIC_MODE_HISTORICAL:
+            return 1200
+        return 9600
+
+    @property
+    def available(self) -> bool:
+        """Return True while valid frames are received."""
+        return self._outage_start is None
+
+    @property
+    def outage_duration(self) -> int:
+        """Return the total time without valid frames since the start, in seconds."""
+        duration = self._outage_duration
+        if self._outage_start is not None:
+            duration += time.monotonic() - self._outage_start
+        return round(duration)
+
+    @property
+    def dropped_frames(self) -> int:
+        """Return the number of frames interrupted, truncated or oversized."""
+        return self._parser.dropped_frames
+
+    @property
+    def byte_rate(self) -> float:
+        """Return the bytes received per second, over the last RATE_WINDOW seconds at least."""
+        now = time.monotonic()
+        start, received = self._rate_sample
+        if now - start >= RATE_WINDOW:
+            self._byte_rate = round((self.bytes_received - received) / (now - start), 1)
+            self._rate_sample = (now, self.bytes_received)
+        return self._byte_rate
+
+    @property
+    def bytes_captured(self) -> int | None:
+        """Return the bytes recorded by the capture, None without a capture."""
+        if self._capture is None:
+            return None
+        return self._capture.bytes_captured
+
+    def start(self) -> None:
+        """Start the background reading task."""
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._task = loop.create_task(self._run())
+            self._sample_loop_lag(loop.time() + LOOP_LAG_INTERVAL)
+
+    async def stop(self) -> None:
+        """Stop the background reading task and close the port."""
+        if self._task is None:
+            return
+        if self._lag_timer is not None:
+            self._lag_timer.cancel()
+            self._lag_timer = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._capture is not None:
+            await self._capture.async_close()
+
+    async def _run(self) -> None:
+        """Keep the port open and read frames until cancelled."""
+        serial_asyncio = await _async_import_serial()
+        backoff = BACKOFF_MIN
+        while True:
+            try:
+                transport, protocol = await self._connect(serial_asyncio)
+            except OSError as exception:
+                # serial.SerialException is an OSError
+                _LOGGER.warning(
+                    "Unable to connect to the serial device %s, retrying in %d s: %s",
+                    self._port, backoff, exception,
+                )
+                transport = None
+            except Exception:  # pylint: disable=broad-except
+                # Such as an invalid URL or a termios error, never end the task
+                _LOGGER.exception(
+                    "Unexpected error connecting to %s, retrying in %d s", self._port, backoff
+                )
+                transport = None
+            if transport is None:
+                await self._wait_reconnect(backoff)
+                backoff = min(backoff * 2, BACKOFF_MAX)
+                continue
+
+            _LOGGER.debug("Serial device %s connected", self._port)
+            connected = self._last_frame = time.monotonic()
+            failed = False
+            try:
+                await self._watch(protocol)
+            except OSError as exception:
+                _LOGGER.warning("Error while reading serial device %s: %s", self._port, exception)
+            except Exception:  # pylint: disable=broad-except
+                # Raised by the parser or a frame callback, through connection_lost
+                _LOGGER.exception(
+                    "Unexpected error reading %s, retrying in %d s", self._port, backoff
+                )
+                failed = True
+            finally:
+                transport.close()
+                self._set_available(False)
+
+            self.reconnections += 1
+            # Reconnect at once after a working connection, back off otherwise
+            if self._last_frame > connected and not failed:
+                backoff = BACKOFF_MIN
+                continue
+            await self._wait_reconnect(backoff)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    async def _connect(
+        self, serial_asyncio: ModuleType
+    ) -> tuple[asyncio.BaseTransport, TeleinfoProtocol]:
+        """Open the port, a local serial port, a TCP socket or a RFC 2217 server."""
+        loop = asyncio.get_running_loop()
+
+        self._parser.reset()
+
+        def protocol_factory() -> TeleinfoProtocol:
+            return TeleinfoProtocol(self._parser, self._on_frame, self._on_data)
+
+        url = urlsplit(self._port)
+        if url.scheme == "socket":
+            transport, protocol = await loop.create_connection(
+                protocol_factory, url.hostname, url.port
+            )
+            _set_keepalive(transport.get_extra_info("socket"))
+            return transport, protocol
+
+        serial_options = {
+            "baudrate": self.baudrate,
+            "bytesize": serial_asyncio.serial.SEVENBITS,
+            "parity": serial_asyncio.serial.PARITY_EVEN,
+            "stopbits": serial_asyncio.serial.STOPBITS_ONE,
+        }
+        if url.scheme:
+            # URL handlers without a file descriptor are read in a thread
+            port = await loop.run_in_executor(
+                None,
+                partial(
+                    serial_asyncio.serial.serial_for_url,
+                    self._port,
+                    timeout=READ_TIMEOUT,
+                    **serial_options,
+                ),
+            )
+            protocol = protocol_factory()
+            transport = SerialThreadTransport(loop, protocol, port)
+            transport.start()
+            return transport, protocol
+
+        return await serial_asyncio.create_serial_connection(
+            loop,
+            protocol_factory,
+            url=self._port,
+            xonxoff=False,
+            rtscts=True,
+            dsrdtr=False,
+            **serial_options,
+        )
+
+    async def _watch(self, protocol: TeleinfoProtocol) -> None:
+        """Return when the port is closed or no valid frame is received anymore."""
+        watchdog = FRAME_PERIOD[self._ticmode] * WATCHDOG_FRAMES
+        while True:
+            timeout = self._last_frame + watchdog - time.monotonic()
+            if timeout <= 0:
+                _LOGGER.warning(
+                    "No valid frame received from %s for %d s, restarting", self._port, watchdog
+                )
+                return
+            done, _ = await asyncio.wait({protocol.closed}, timeout=timeout)
+            if done:
+                protocol.closed.result()
+                _LOGGER.warning("Serial device %s closed", self._port)
+                return
+
+    async def _wait_reconnect(self, backoff: float) -> None:
+        """Sleep for about backoff seconds, less if the port path reappears."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + random.uniform(backoff / 2, backoff)
+        if "://" in self._port:
+            await asyncio.sleep(deadline - loop.time())
+            return
+
+        missing = False
+        while (delay := deadline - loop.time()) > 0:
+            exists = await loop.run_in_executor(None, os.path.exists, self._port)
+            if missing and exists:
+                _LOGGER.debug("Serial device %s reappeared", self._port)
+                return
+            missing = not exists
+            await asyncio.sleep(min(delay, PORT_POLL_INTERVAL))
+
+    def _set_available(self, available: bool) -> None:
+        """Track the outages and notify availability changes."""
+        if available == self.available:
+            return
+        now = time.monotonic()
+        if available:
+            self._outage_duration += now - self._outage_start
+            self._outage_start = None
+        else:
+            self._outage_start = now
+            self.frame = ()
+        if self.availability_callback is not None:
+            self.availability_callback(available)
+
+    def _sample_loop_lag(self, expected: float) -> None:
+        """Measure how late the event loop runs a timer, while reading."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if expected <= now:
+            self.loop_lag.add(now - expected)
+        self._lag_timer = loop.call_at(
+            now + LOOP_LAG_INTERVAL, self._sample_loop_lag, now + LOOP_LAG_INTERVAL
+        )
+
+    def _on_data(self, data: bytes, parse_time: float) -> None:
+        """Count a received chunk and record it if capturing."""
+        self.bytes_received += len(data)
+        self.parse_time.add(parse_time)
+        if self._capture is not None:
+            self._capture.write(data)
+
+    def _on_frame(self, frame: TeleinfoFrame) -> None:
+        """Keep the valid groups of the last complete frame."""
+        frame_time = time.monotonic()
+        frame, invalid = validate_frame(frame)
+        self.frames_received += 1
+        if invalid:
+            _LOGGER.debug("Dropping %d groups with an invalid checksum", invalid)
+            self.invalid_frames += 1
+            self.invalid_groups += invalid
+        if not frame:
+            return
+        _LOGGER.debug("Got frame with %d groups", len(frame))
+        self._last_frame = self.frame_time = frame_time
+        self.frame = frame
+        self._set_available(True)
+        self.frame_received.set()
+        if self.frame_callback is not None:
+            self.frame_callback(frame)
+
+
+def _set_keepalive(sock: socket.socket | None) -> None:
+    """Detect a dead TCP link in about KEEPALIVE_IDLE + 3 * KEEPALIVE_INTERVAL seconds."""
+    if sock is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+async def _async_import_serial() -> ModuleType:
+    """Import pyserial in the executor, on the first start of a reader only.
+
+    pyserial is not imported with the integration, the imports of its platform
+    modules read files and would block the event loop during the startup.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, importlib.import_module, "serial_asyncio_fast")
+
+
+class SerialThreadTransport(asyncio.Transport):
+    """Read a pyserial URL port in a thread, for the handlers without a file descriptor."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        protocol: asyncio.Protocol,
+        port: serial.SerialBase,
+    ) -> None:
+        """Initialize the transport on an open port."""
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._port = port
+        self._closing = False
+        self._thread = threading.Thread(target=self._read, name="teleinfo_reader", daemon=True)
+
+    def start(self) -> None:
+        """Start reading the port."""
+        self._protocol.connection_made(self)
+        self._thread.start()
+
+    def _read(self) -> None:
+        """Forward the received bytes in bulk until closed."""
+        exception = None
+        try:
+            while not self._closing:
+                data = self._port.read(self._port.in_waiting or 1)
+                if data:
+                    self._loop.call_soon_threadsafe(self._protocol.data_received, data)
+        except OSError as err:
+            # serial.SerialException is an OSError
+            exception = err
+        finally:
+            self._port.close()
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._protocol.connection_lost, exception)
+
+    def close(self) -> None:
+        """Stop reading, the port is closed within READ_TIMEOUT."""
+        self._closing = True
+
+    def is_closing(self) -> bool:
+        """Return True once closed."""
+        return self._closing
+
+
+class TeleinfoProtocol(asyncio.Protocol):
+    """Feed the bytes received on the port to the frame parser."""
+
+    def __init__(
+        self,
+        parser: TeleinfoFrameParser,
+        on_frame: Callable[[TeleinfoFrame], None],
+        on_data: Callable[[bytes, float], None],
+    ) -> None:
+        """Initialize the protocol."""
+        self._parser = parser
+        self._on_frame = on_frame
+        self._on_data = on_data
+        self._transport: asyncio.BaseTransport | None = None
+        self.closed: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Keep the transport, to drop what it delivers once closed."""
+        self._transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        """Parse the received chunk and forward completed frames."""
+        # A reading thread may deliver a last chunk after the close, when the
+        # parser already belongs to the next connection
+        if self._transport is not None and self._transport.is_closing():
+            return
+        start = time.perf_counter()
+        frames = self._parser.feed(data)
+        self._on_data(data, time.perf_counter() - start)
+        for frame in frames:
+            self._on_frame(frame)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Wake up the reader when the port is closed."""
+        if self.closed.done():
+            return
+        if exc is None:
+            self.closed.set_result(None)
+        else:
+            self.closed.set_exception(exc)
@@ -0,0 +1,423 @@
+"""Offline replay and benchmark of the Teleinfo read path.
+
+Recorded TIC bytes are fed through the frame parser, the checksum validation,
+the coordinator and the label sensors, at the meter byte rate times a speed
+factor (0 for as fast as possible), to report the throughput, state writes,
+memory and event loop latency of the read path without a meter. Without any capture, synthetic frames are
+used, optionally corrupted or truncated:
+
+    python -m custom_components.teleinfo.replay --mode standard --speed 0
+    python -m custom_components.teleinfo.replay --benchmark capture.tic
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import datetime
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from homeassistant.core import HomeAssistant, callback
+
+from .capture import CAPTURE_MAGIC, GZIP_MAGIC, read_capture
+from .checksum import compute_checksum, validate_frame
+from .const import (
+    TELEINFO_LABELS,
+    TELEINFO_LIVE_LABELS,
+    TIC_MODE_HISTORICAL,
+    TIC_MODE_STANDARD,
+)
+from .coordinator import TeleinfoCoordinator, decode_frame
+from .parser import HT, SP, TeleinfoFrame, TeleinfoFrameParser
+from .sensor import TeleinfoSensorEntity
+
+# 7E1 framing: 10 bits on the line per byte.
+BYTE_RATE = {
+    TIC_MODE_HISTORICAL: 1200 // 10,
+    TIC_MODE_STANDARD: 9600 // 10,
+}
+
+SEPARATORS = {
+    TIC_MODE_HISTORICAL: SP,
+    TIC_MODE_STANDARD: HT,
+}
+
+# (label, horodate, value) of typical frames, values are formatted with the
+# frame number and a pseudo random load.
+SAMPLE_GROUPS = {
+    TIC_MODE_HISTORICAL: [
+        ('ADCO', None, '031762120162'),
+        ('OPTARIF', None, 'HC..'),
+        ('ISOUSC', None, '45'),
+        ('HCHC', None, '{index:09d}'),
+        ('HCHP', None, '{index:09d}'),
+        ('PTEC', None, 'HP..'),
+        ('IINST', None, '{current:03d}'),
+        ('IMAX', None, '090'),
+        ('PAPP', None, '{power:05d}'),
+        ('HHPHC', None, 'A'),
+        ('MOTDETAT', None, '000000'),
+    ],
+    TIC_MODE_STANDARD: [
+        ('ADSC', None, '041876097556'),
+        ('VTIC', None, '02'),
+        ('DATE', 'H{date}', ''),
+        ('NGTF', None, '      TEMPO     '),
+        ('LTARF', None, '    HP  BLEU    '),
+        ('EAST', None, '{index:09d}'),
+        *((f'EASF{n:02}', None, '{index:09d}') for n in range(1, 11)),
+        *((f'EASD{n:02}', None, '{index:09d}') for n in range(1, 5)),
+        ('IRMS1', None, '{current:03d}'),
+        ('URMS1', None, '232'),
+        ('PREF', None, '09'),
+        ('PCOUP', None, '09'),
+        ('SINSTS', None, '{power:05d}'),
+        ('SMAXSN', 'H{date}', '07196'),
+        ('SMAXSN-1', 'H{date}', '06824'),
+        ('CCASN', 'H{date}', '{power:05d}'),
+        ('CCASN-1', 'H{date}', '01234'),
+        ('UMOY1', 'H{date}', '231'),
+        ('STGE', None, '013A0401'),
+        ('MSG1', None, 'PAS DE          MESSAGE         '),
+        ('PRM', None, '21490012345678'),
+        ('RELAIS', None, '000'),
+        ('NTARF', None, '02'),
+        ('NJOURF', None, '00'),
+        ('NJOURF+1', None, '00'),
+        ('PJOURF+1', None, '00004001 06004002 22004001 NONUTILE NONUTILE'),
+    ],
+}
+
+
+def encode_group(label: bytes, value: bytes, horodate: bytes | None = None, separator: int = HT) -> bytes:
+    """Return a group with its LF/CR delimiters and checksum."""
+    sep = bytes((separator,))
+    raw = label + sep
+    if horodate is not None:
+        raw += horodate + sep
+    raw += value + sep
+    # compute_checksum expects the checksum byte last, use a placeholder
+    checksum = compute_checksum(raw + b'\x00', separator)
+    return b'\n' + raw + bytes((checksum,)) + b'\r'
+
+
+def sample_frame(
+    ticmode: str,
+    number: int,
+    power: int,
+    groups: list[tuple[str, str | None, str]] | None = None,
+) -> bytearray:
+    """Return a synthetic frame, the number-th with an apparent power load."""
+    separator = SEPARATORS[ticmode]
+    fields = {
+        'index': 12345678 + number,
+        'power': power,
+        'current': power // 230,
+        'date': time.strftime('%y%m%d%H%M%S', time.gmtime(1700000000 + 2 * number)),
+    }
+    frame = bytearray(b'\x02')
+    for label, horodate, value in SAMPLE_GROUPS[ticmode] if groups is None else groups:
+        frame += encode_group(
+            label.encode('ascii'),
+            value.format(**fields).encode('ascii'),
+            horodate.format(**fields).encode('ascii') if horodate else None,
+            separator,
+        )
+    frame += b'\x03'
+    return frame
+
+
+def sample_capture(
+    ticmode: str,
+    frames: int = 100,
+    corrupt: float = 0.0,
+    truncate: float = 0.0,
+    seed: int = 0,
+) -> bytes:
+    """Return synthetic frames, with a ratio of corrupted groups and truncated frames."""
+    rng = random.Random(seed)
+    capture = bytearray()
+    for number in range(frames):
+        frame = sample_frame(ticmode, number, rng.randrange(100, 9000))
+        if corrupt:
+            # Flip a bit in the first value byte of some groups
+            start = frame.find(b'\n')
+            while start >= 0:
+                if rng.random() < corrupt:
+                    frame[frame.find(SEPARATORS[ticmode], start) + 1] ^= 0x01
+                start = frame.find(b'\n', start + 1)
+        if rng.random() < truncate:
+            frame = frame[:rng.randrange(1, len(frame) - 1)]
+        capture += frame
+    return bytes(capture)
+
+
+def load_capture(path: str) -> bytes:
+    """Return the raw TIC bytes of a capture file, recorded by the integration or not."""
+    with open(path, 'rb') as capture:
+        header = capture.read(len(CAPTURE_MAGIC))
+        if not header.startswith(GZIP_MAGIC) and header != CAPTURE_MAGIC:
+            return header + capture.read()
+    return b''.join(data for _, data in read_capture(path))
+
+
+@dataclass
+class ReplayStats:
+    """Measurements of a replay."""
+
+    bytes: int = 0
+    frames: int = 0
+    groups: int = 0
+    invalid_groups: int = 0
+    values: int = 0
+    state_writes: int = 0
+    skipped_writes: int = 0
+    rejected_values: int = 0
+    elapsed: float = 0.0
+    loop_lag_max: float = 0.0
+    loop_lag_total: float = 0.0
+    loop_lag_samples: int = 0
+    peak_memory: int | None = None
+    # Memory allocated on top of the live memory while handling a frame
+    frame_memory_total: int = 0
+    frame_memory_max: int = 0
+
+    @property
+    def frames_per_second(self) -> float:
+        """Return the frame throughput."""
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def groups_per_second(self) -> float:
+        """Return the group throughput."""
+        return self.groups / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def frame_memory_mean(self) -> float:
+        """Return the mean memory allocated while handling a frame."""
+        return self.frame_memory_total / self.frames if self.frames else 0.0
+
+    @property
+    def loop_lag_mean(self) -> float:
+        """Return the mean event loop lag."""
+        return self.loop_lag_total / self.loop_lag_samples if self.loop_lag_samples else 0.0
+
+    def __str__(self) -> str:
+        """Return a readable report."""
+        lines = [
+            f"bytes            {self.bytes}",
+            f"frames           {self.frames} ({self.frames_per_second:.1f}/s)",
+            f"groups           {self.groups} ({self.groups_per_second:.1f}/s)",
+            f"invalid groups   {self.invalid_groups}",
+            f"values           {self.values}",
+            f"state writes     {self.state_writes} ({self.skipped_writes} skipped, "
+            f"{self.rejected_values} rejected)",
+            f"elapsed          {self.elapsed:.3f} s",
+            f"loop lag         mean {self.loop_lag_mean * 1000:.2f} ms, "
+            f"max {self.loop_lag_max * 1000:.2f} ms",
+        ]
+        if self.peak_memory is not None and self.frames:
+            lines.append(f"peak memory      {self.peak_memory} B")
+            lines.append(
+                f"frame memory     mean {self.frame_memory_mean:.0f} B, "
+                f"max {self.frame_memory_max} B"
+            )
+        return "\n".join(lines)
+
+
+class ReplayReader:
+    """Stand-in of the reader, fed with the replayed frames instead of a port."""
+
+    def __init__(self, ticmode: str) -> None:
+        """Initialize the reader."""
+        self.port = f"replay-{ticmode}"
+        self.available = True
+        self.availability_callback = None
+        self.frame_callback = None
+        self.frame: TeleinfoFrame = ()
+        self.frame_time = 0.0
+        self.frame_received = asyncio.Event()
+
+    def receive(self, frame: TeleinfoFrame) -> None:
+        """Keep a valid frame as the reader does."""
+        self.frame_time = time.monotonic()
+        self.frame = frame
+        self.frame_received.set()
+        if self.frame_callback is not None:
+            self.frame_callback(frame)
+
+
+class ReplaySensorEntity(TeleinfoSensorEntity):
+    """Label sensor whose states are counted by the coordinator but not written."""
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Drop the state, there is no state machine to write to."""
+
+
+def _async_add_replay_entities(coordinator: TeleinfoCoordinator) -> None:
+    """Subscribe a sensor to each label sent by the meter, as the platform does."""
+
+    @callback
+    def _async_add_meter(meter_id: str) -> None:
+        @callback
+        def _async_add_labels(keys: set[str]) -> None:
+            for key in keys:
+                entity = ReplaySensorEntity(coordinator, meter_id, None, labels[key])
+                coordinator.async_add_listener(key, entity._on_update)
+
+        coordinator.async_add_keys_listener(_async_add_labels)
+
+    labels = {label.key: label for label in TELEINFO_LABELS[coordinator.ticmode].values()}
+    coordinator.async_add_meter_listener(_async_add_meter)
+
+
+async def _monitor_loop_lag(stats: ReplayStats, interval: float) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - expected, 0.0)
+        stats.loop_lag_total += lag
+        stats.loop_lag_samples += 1
+        stats.loop_lag_max = max(stats.loop_lag_max, lag)
+
+
+async def async_replay(
+    data: bytes,
+    ticmode: str,
+    speed: float = 0.0,
+    chunk_size: int = 64,
+    trace_memory: bool = False,
+) -> ReplayStats:
+    """Replay raw TIC bytes through the read path and return its measurements.
+
+    The bytes are sent at the meter byte rate times speed, or as fast as
+    possible if speed is 0, in chunks of chunk_size bytes like a serial port.
+    Each valid frame is published by the coordinator to the label sensors,
+    through their write filters and energy index guard.
+    """
+    # The snapshot of the last frame is saved to a throwaway configuration
+    config_dir = tempfile.TemporaryDirectory()
+    hass = HomeAssistant(config_dir.name)
+    reader = ReplayReader(ticmode)
+    coordinator = TeleinfoCoordinator(hass, reader, ticmode, datetime.timedelta(0))
+    _async_add_replay_entities(coordinator)
+    parser = TeleinfoFrameParser()
+    stats = ReplayStats()
+    loop = asyncio.get_running_loop()
+    monitor = loop.create_task(_monitor_loop_lag(stats, 0.01))
+    byte_rate = BYTE_RATE[ticmode] * speed
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = loop.time()
+    try:
+        for offset in range(0, len(data), chunk_size):
+            chunk = data[offset:offset + chunk_size]
+            for frame in parser.feed(chunk):
+                if trace_memory:
+                    tracemalloc.reset_peak()
+                    memory = tracemalloc.get_traced_memory()[0]
+                frame, invalid = validate_frame(frame)
+                stats.frames += 1
+                stats.groups += len(frame)
+                stats.invalid_groups += invalid
+                if frame:
+                    reader.receive(frame)
+                    coordinator.async_refresh()
+                    stats.values += len(coordinator.data)
+                if trace_memory:
+                    frame_memory = tracemalloc.get_traced_memory()[1] - memory
+                    stats.frame_memory_total += frame_memory
+                    stats.frame_memory_max = max(stats.frame_memory_max, frame_memory)
+            stats.bytes += len(chunk)
+
+            if byte_rate:
+                delay = start + stats.bytes / byte_rate - loop.time()
+                await asyncio.sleep(max(delay, 0))
+            else:
+                await asyncio.sleep(0)
+        stats.elapsed = loop.time() - start
+    finally:
+        monitor.cancel()
+        stats.state_writes = coordinator.state_writes
+        stats.skipped_writes = coordinator.skipped_writes
+        stats.rejected_values = coordinator.rejected_values
+        if trace_memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        # Also cancels the delayed save of the snapshot
+        await coordinator.async_save_snapshot()
+        config_dir.cleanup()
+
+    return stats
+
+
+def benchmark(data: bytes, ticmode: str, number: int = 10) -> dict[str, float]:
+    """Return the time per frame, in microseconds, of each stage of the read path.
+
+    The live stage is the dispatch of the instantaneous labels on each frame
+    in live mode.
+    """
+    labels = TELEINFO_LABELS[ticmode]
+    live_labels = TELEINFO_LIVE_LABELS[ticmode]
+    frames = TeleinfoFrameParser().feed(data)
+    if not frames:
+        raise ValueError("No frame in the capture")
+    valid_frames = [validate_frame(frame)[0] for frame in frames]
+
+    stages = {
+        'parse': lambda: TeleinfoFrameParser().feed(data),
+        'checksum': lambda: [validate_frame(frame) for frame in frames],
+        'dispatch': lambda: [decode_frame(frame, labels) for frame in valid_frames],
+        'live': lambda: [decode_frame(frame, live_labels) for frame in valid_frames],
+    }
+    return {
+        stage: min(timeit.repeat(function, number=number, repeat=3)) / number / len(frames) * 1e6
+        for stage, function in stages.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a replay or a benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('captures', nargs='*', help="raw TIC capture files")
+    parser.add_argument('--mode', choices=list(BYTE_RATE), default=TIC_MODE_STANDARD)
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="replay speed factor, 0 for as fast as possible")
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--frames', type=int, default=1000,
+                        help="number of synthetic frames without capture")
+    parser.add_argument('--corrupt', type=float, default=0.0,
+                        help="ratio of corrupted synthetic groups")
+    parser.add_argument('--truncate', type=float, default=0.0,
+                        help="ratio of truncated synthetic frames")
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--benchmark', action='store_true',
+                        help="time each stage of the read path instead")
+    args = parser.parse_args(argv)
+
+    if args.captures:
+        data = b''.join(load_capture(path) for path in args.captures)
+    else:
+        data = sample_capture(args.mode, args.frames, args.corrupt, args.truncate)
+
+    if args.benchmark:
+        for stage, duration in benchmark(data, args.mode).items():
+            print(f"{stage:<10} {duration:8.2f} us/frame")
+        return
+
+    print(asyncio.run(async_replay(
+        data, args.mode, args.speed, args.chunk_size, args.trace_memory
+    )))
+
+
+if __name__ == '__main__':
+    main()
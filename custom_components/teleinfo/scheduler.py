@@ -0,0 +1,97 @@
+"""Teleinfo reader scheduler.
+
+A single scheduler runs the readers of all the meters on the event loop: each
+meter costs its reader coroutine, and the coordinators sharing a refresh
+interval are refreshed by a single timer.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+from functools import partial
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .coordinator import TeleinfoCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+
+class TeleinfoScheduler:
+    """Run the readers and refresh the coordinators of all the meters."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._coordinators: dict[datetime.timedelta, list[TeleinfoCoordinator]] = {}
+        self._unsub_refresh: dict[datetime.timedelta, CALLBACK_TYPE] = {}
+        self._first_refresh: dict[TeleinfoCoordinator, asyncio.Task] = {}
+
+    @property
+    def coordinators(self) -> list[TeleinfoCoordinator]:
+        """Return the coordinators of all the meters."""
+        return [
+            coordinator
+            for coordinators in self._coordinators.values()
+            for coordinator in coordinators
+        ]
+
+    @callback
+    def async_add_meter(self, coordinator: TeleinfoCoordinator) -> None:
+        """Start reading a meter and refreshing its coordinator."""
+        coordinator.reader.start()
+        self._first_refresh[coordinator] = self.hass.async_create_background_task(
+            coordinator.async_first_refresh(), f"{DOMAIN} first refresh"
+        )
+
+        refresh = coordinator.refresh
+        self._coordinators.setdefault(refresh, []).append(coordinator)
+        if refresh not in self._unsub_refresh:
+            self._unsub_refresh[refresh] = async_track_time_interval(
+                self.hass, partial(self._async_refresh, refresh), refresh
+            )
+
+    async def async_remove_meter(self, coordinator: TeleinfoCoordinator) -> None:
+        """Stop reading a meter."""
+        refresh = coordinator.refresh
+        coordinators = self._coordinators[refresh]
+        coordinators.remove(coordinator)
+        if not coordinators:
+            del self._coordinators[refresh]
+            self._unsub_refresh.pop(refresh)()
+
+        self._first_refresh.pop(coordinator).cancel()
+        await coordinator.reader.stop()
+        await coordinator.async_save_snapshot()
+
+    async def async_shutdown(self) -> None:
+        """Stop reading all the meters."""
+        await asyncio.gather(*(
+            self.async_remove_meter(coordinator) for coordinator in self.coordinators
+        ))
+
+    @callback
+    def _async_refresh(self, refresh: datetime.timedelta, _now: datetime.datetime) -> None:
+        """Refresh the coordinators of an interval."""
+        for coordinator in self._coordinators.get(refresh, ()):
+            coordinator.async_refresh()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> TeleinfoScheduler:
+    """Return the scheduler shared by all the meters."""
+    if DATA_SCHEDULER not in hass.data:
+        scheduler = hass.data[DATA_SCHEDULER] = TeleinfoScheduler(hass)
+
+        async def _async_shutdown(_: Event) -> None:
+            await scheduler.async_shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+
+    return hass.data[DATA_SCHEDULER]
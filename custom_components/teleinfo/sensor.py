@@ -30,63 +30,85 @@ Sample configuration.yaml
 from __future__ import annotations
 
 import logging
-import datetime
-import asyncio
+import time
 
-from serial import SerialException
-import serial_asyncio_fast as serial_asyncio
 import voluptuous as vol
 
 from datetime import timedelta
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA as TELEINFO_PLATFORM_SCHEMA,
+    RestoreSensor,
     SensorEntity,
     SensorStateClass,
-    SensorDeviceClass
 )
 from homeassistant.const import (
     CONF_NAME,
-    ATTR_ATTRIBUTION,
-    STATE_UNAVAILABLE,
-    STATE_UNKNOWN,
-    UnitOfEnergy,
-    UnitOfApparentPower
+    Platform,
 )
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.device_registry import DeviceInfo, DeviceEntryType
-from homeassistant.helpers.event import (
-    async_track_time_interval,
-    async_track_state_change_event,
-)
 
 from .const import (
+    CONF_AGGREGATES,
+    CONF_EVENTS,
+    CONF_HISTORY,
+    CONF_LIVE,
+    CONF_REFRESH,
+    DEFAULT_EVENTS,
+    DEFAULT_REFRESH,
     DOMAIN,
+    REFRESH_CHOICES,
     DEVICE_MANUFACTURER,
     TIC_MODE_HISTORICAL,
     TIC_MODE_STANDARD,
-    TELEINFO_ENTITIES
+    TELEINFO_LABELS,
+    TELEINFO_DIAGNOSTIC_ENTITIES,
+    TELEINFO_EVENTS_NONE,
+    TELEINFO_EVENTS_FRAME,
+    TeleinfoDiagnosticDescription,
+    TeleinfoLabel,
 )
+from .capture import TeleinfoCapture
+from .coordinator import TeleinfoCoordinator
+from .history import MAX_HISTORY_SIZE
+from .reader import TeleinfoReader
+from .scheduler import async_get_scheduler
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 CONF_SERIAL_PORT = "serial_port"
 CONF_TIC_MODE = "tic_mode"
-CONF_REFRESH = "refresh"
+CONF_CAPTURE = "capture"
+CONF_PATH = "path"
+CONF_MAX_SIZE = "max_size"
+CONF_BACKUPS = "backups"
+CONF_FILTERS = "filters"
+CONF_DEADBAND = "deadband"
+CONF_MIN_INTERVAL = "min_interval"
 
 CONF_ATTRIBUTION = "Provided by EDF Teleinfo."
 
-DEFAULT_NAME = "Teleinfo Sensor"
-DEFAULT_TIC_MODE = TIC_MODE_HISTORICAL
+# An energy index decreasing, or increasing faster than ENERGY_MAX_RATE Wh/s,
+# is only accepted once received on ENERGY_CONFIRMATIONS consecutive updates,
+# so that a corrupted value is not taken for a meter reset by the statistics.
+ENERGY_MAX_RATE = 50
+ENERGY_CONFIRMATIONS = 3
 
-FRAME_START = '\x02'
-FRAME_END = '\x03'
+DEFAULT_TIC_MODE = TIC_MODE_HISTORICAL
 
-DEFAULT_NAME = "Serial Teleinfo Sensor"
-DEFAULT_REFRESH = 30
+# Unique id of the total energy sensor before the entities were per meter, its
+# statistics are kept by moving it to the EAST sensor of the first meter.
+LEGACY_TOTAL_ENERGY_UNIQUE_ID = f"teleinfo-{DOMAIN} energie active soutirée totale"
+LEGACY_TOTAL_ENERGY_KEY = 'EAST'
 
 PLATFORM_SCHEMA = TELEINFO_PLATFORM_SCHEMA.extend({
     vol.Required(CONF_SERIAL_PORT): cv.string,
@@ -95,321 +117,339 @@ PLATFORM_SCHEMA = TELEINFO_PLATFORM_SCHEMA.extend({
             TIC_MODE_HISTORICAL,
             TIC_MODE_STANDARD
         ]),
-    vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
-    vol.Optional(CONF_REFRESH, default=DEFAULT_REFRESH): vol.In([10,30,60,120,300]),
+    vol.Optional(CONF_NAME): cv.string,
+    vol.Optional(CONF_REFRESH, default=DEFAULT_REFRESH): vol.In(REFRESH_CHOICES),
+    vol.Optional(CONF_EVENTS, default=DEFAULT_EVENTS): vol.In(
+        [
+            TELEINFO_EVENTS_NONE,
+            TELEINFO_EVENTS_FRAME
+        ]),
+    vol.Optional(CONF_LIVE, default=False): cv.boolean,
+    vol.Optional(CONF_AGGREGATES, default=False): cv.boolean,
+    vol.Optional(CONF_HISTORY, default=0): vol.All(
+        cv.positive_int, vol.Range(max=MAX_HISTORY_SIZE)
+    ),
+    vol.Optional(CONF_CAPTURE): vol.Schema({
+        vol.Required(CONF_PATH): cv.string,
+        vol.Optional(CONF_MAX_SIZE, default=10): cv.positive_int,
+        vol.Optional(CONF_BACKUPS, default=5): cv.positive_int,
+    }),
+    vol.Optional(CONF_FILTERS, default={}): {
+        cv.string: vol.Schema({
+            vol.Optional(CONF_DEADBAND, default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_MIN_INTERVAL, default=0): cv.positive_int,
+        })
+    },
 })
 
-TELEINFO_TOTAL_ENERGY_KEY = 'EAST'
-
 async def async_setup_platform(
-    hass: HomeAssitant,
+    hass: HomeAssistant,
     config: ConfigType,
     async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None :
     """Set up the Teleinfo (serial) sensor platform."""
-    name = DOMAIN + " Energie active soutirée totale"
     port = config.get(CONF_SERIAL_PORT)
     ticmode = config.get(CONF_TIC_MODE)
+    filters = config.get(CONF_FILTERS)
     refresh = timedelta(seconds=int(config.get(CONF_REFRESH)))
-    
-    teleinfo_total_energy_serial_sensor_entity = TeleinfoTotalEnergySerialSensorEntity(name, port, ticmode, refresh)
-    
-    entities = [teleinfo_total_energy_serial_sensor_entity];
-    for eparam in TELEINFO_ENTITIES[ticmode]["string"]:
-        e = TeleinfoStringSensorEntity(eparam['name'], eparam['key'],
-            eparam['state_class'], eparam['device_class'], eparam['unit'], eparam['icon'])
-        entities.append(e)
+    live = config.get(CONF_LIVE)
+
+    capture = None
+    if CONF_CAPTURE in config:
+        capture = TeleinfoCapture(
+            hass.config.path(config[CONF_CAPTURE][CONF_PATH]),
+            config[CONF_CAPTURE][CONF_MAX_SIZE] * 1024 * 1024,
+            config[CONF_CAPTURE][CONF_BACKUPS],
+        )
 
-    for eparam in TELEINFO_ENTITIES[ticmode]["integer"]:
-        e = TeleinfoIntegerSensorEntity(eparam['name'], eparam['key'],
-            eparam['state_class'], eparam['device_class'], eparam['unit'], eparam['icon'])
-        entities.append(e)
+    reader = TeleinfoReader(port, ticmode, capture)
+    coordinator = TeleinfoCoordinator(
+        hass,
+        reader,
+        ticmode,
+        refresh,
+        config.get(CONF_EVENTS) == TELEINFO_EVENTS_FRAME,
+        live,
+        config.get(CONF_AGGREGATES),
+        config.get(CONF_HISTORY),
+    )
+
+    _async_add_meter_entities(
+        coordinator, async_add_entities, filters, standalone=True, name=config.get(CONF_NAME)
+    )
+    async_get_scheduler(hass).async_add_meter(coordinator)
+    async_setup_services(hass)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Teleinfo sensors of a config entry."""
+    coordinator: TeleinfoCoordinator = hass.data[DOMAIN][entry.entry_id]
+    _async_add_meter_entities(coordinator, async_add_entities, {})
+    async_setup_services(hass)
 
-    async_add_entities(entities, True)
 
-class TeleinfoTotalEnergySerialSensorEntity(SensorEntity):
-    """Representation of a Teleinfo sensor."""
+@callback
+def _async_add_meter_entities(
+    coordinator: TeleinfoCoordinator,
+    async_add_entities: AddEntitiesCallback,
+    filters: dict,
+    standalone: bool = False,
+    name: str | None = None,
+) -> None:
+    """Create the entities of a coordinator once its meter has identified itself.
 
-    def __init__(
-        self,
-        name,
-        port,
-        ticmode,
-        refresh,
-    ):
-        """Initialize the Teleinfo Serial sensor."""
-        self._attr_has_entity_name = True
-        self._attr_name = name
-        self._attr_unique_id =f"teleinfo-{self._attr_name.lower()}"
-        self._port = port
-        self._ticmode = ticmode
-        self._refresh = refresh
-        self._attr_native_value = None
-        
-        self._attributes = {
-            ATTR_ATTRIBUTION: CONF_ATTRIBUTION,
-        }
+    The label sensors are only created for the labels sent by the meter. The
+    standalone entities of the YAML platform have no config entry, hence no
+    device naming them, their names start with name or the meter identifier.
+    """
 
     @callback
-    async def async_added_to_hass(self) -> None:
-        """Handle when an entity is about to be added to Home Assistant."""
-        
-        # Timer arm
-        self._timer_cancel = async_track_time_interval(
-            self.hass,
-            self.read_frame,
-            interval=self._refresh,
+    def _async_add_entities(meter_id: str) -> None:
+        _async_migrate_legacy_entity(coordinator, meter_id)
+        name_prefix = (name or f"{DOMAIN} {meter_id}") if standalone else None
+        device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, meter_id)},
+            name=f"Teleinfo {meter_id}",
+            manufacturer=DEVICE_MANUFACTURER,
+            model=_meter_model(coordinator),
         )
-        # Timer cancel
-        self.async_on_remove(self._timer_cancel)
 
-    @callback
-    async def read_frame(self,_):
-        """Read the data from the port."""
-        try:
-            if self._ticmode == TIC_MODE_HISTORICAL:
-                baudrate = 1200
-            else:
-                baudrate = 9600
-            
-            reader, writer = await serial_asyncio.open_serial_connection(
-                url=self._port,
-                baudrate=baudrate,
-                bytesize=serial_asyncio.serial.SEVENBITS,
-                parity=serial_asyncio.serial.PARITY_EVEN,
-                stopbits=serial_asyncio.serial.STOPBITS_ONE,
-                xonxoff=False,
-                rtscts=True,
-                dsrdtr=False,
+        @callback
+        def _async_add_label_entities(keys: set[str]) -> None:
+            model = _meter_model(coordinator)
+            if model != device_info["model"]:
+                # The profile labels were missing from the first frame
+                device_info["model"] = model
+                device_registry = dr.async_get(coordinator.hass)
+                device = device_registry.async_get_device(identifiers={(DOMAIN, meter_id)})
+                if device is not None:
+                    device_registry.async_update_device(device.id, model=model)
+
+            async_add_entities(
+                TeleinfoSensorEntity(
+                    coordinator, meter_id, device_info, label, filters.get(label.key), name_prefix
+                )
+                for label in TELEINFO_LABELS[coordinator.ticmode].values()
+                if label.key in keys
             )
-        except SerialException:
-            _LOGGER.exception("Unable to connect to the serial device %s", self._port)
-            await self._timer_cancel()
-        else:
-            _LOGGER.debug("Serial device %s connected", self._port)
-            
-            try:
-                # First read need to clear the grimlins.
-                line = await reader.readline()
-                line = line.decode('ascii').replace('\r', '').replace('\n', '')
-        
-                while FRAME_START not in line:
-                    line = await reader.readline()
-                    line = line.decode('ascii').replace('\r', '').replace('\n', '')
-        
-                _LOGGER.debug(" Start Frame")
-                
-                line=''
-                while FRAME_END not in line:
-                    line = await reader.readline()
-                    line = line.decode('ascii').replace('\r', '').replace('\n', '')
-                    
-                    s = line.split('\t')
-                    if len(s) == 3:
-                        key = s[0]
-                        value = s[1]
-                        checksum = s[2]
-                        ts = None
-                    elif len(s) == 4:
-                        key = s[0]
-                        value = s[2]
-                        checksum = s[3]
-                        raw_ts = s[1][1:1+2*5]
-                        ts = datetime.datetime.strptime(raw_ts, "%y%m%d%H%S")
-                        
-                    _LOGGER.debug(" Got : [%s] =  (%s)", key, value)
-                    self.hass.bus.fire(
-                        "teleinfo_"+ key + "_read_event",
-                        {"value": value, "timestamp": ts},
-                    )
-                    
-                    if key == TELEINFO_TOTAL_ENERGY_KEY:
-                        self._attr_native_value = int(value)
-                        self.async_write_ha_state()
-                
-                writer.close()
-                await writer.wait_closed()
-                
-                _LOGGER.debug(" End Frame")
-                
-            except SerialException:
-                _LOGGER.exception("Error while reading serial device %s", self._port)
-                await self._timer_cancel()
-
-    def _validate_checksum(self,frame,checksum):
-        """Check if a frame is valid."""
-        # Checksum validation method B
-        datas = frame[:-1]
-        if self._validate_checksum_internal(datas, checksum):
-            return True
 
-        # Checksum validation method A
-        datas = frame[:-2]
-        if self._validate_checksum_internal(datas, checksum):
-            return True
+        coordinator.async_add_keys_listener(_async_add_label_entities)
 
-        _LOGGER.warning(
-            "Invalid checksum for %s : %s",
-            frame,
-            ord(checksum),
-        )
-        return False
-    
-    def _validate_checksum_internal(self, datas, checksum):
-        """Check if a frame is valid."""
-        computed_checksum = (sum(datas) & 0x3F) + 0x20
-        if computed_checksum == ord(checksum):
-            return True
+        entities = []
+        for description in TELEINFO_DIAGNOSTIC_ENTITIES:
+            if description.live and not coordinator.live:
+                continue
+            e = TeleinfoDiagnosticSensorEntity(
+                coordinator, meter_id, device_info, description, name_prefix
+            )
+            entities.append(e)
 
-        _LOGGER.debug(
-            "Invalid checksum for %s : %s != %s",
-            datas,
-            computed_checksum,
-            ord(checksum),
-        )
+        async_add_entities(entities)
 
-        return False
+    coordinator.async_add_meter_listener(_async_add_entities)
 
-    def detect():
-        """Return a list of candidate paths for USB Teleinfo dongles.
-
-        This method is currently a bit simplistic, it may need to be
-        improved to support more configurations and OS.
-        """
-        globs_to_test = [
-            "/dev/tty*",
-            "/dev/serial/by-id/*",
-            "/workspaces/integration_teleinfo/reader",
-        ]
-        found_paths = []
-        for current_glob in globs_to_test:
-            found_paths.extend(glob.glob(current_glob))
-
-        return found_paths
-
-    def validate_path(path: str):
-        """Return True if the provided path points to a valid serial port, False otherwise."""
-        try:
-            # Creating the serial communicator will raise an exception
-            # if it cannot connect
-            with serial.serial_for_url(url=path):
-                return True
 
-        except serial.SerialException as exception:
-            _LOGGER.warning("Serial path %s is invalid: %s", path, str(exception))
-            return False
+@callback
+def _async_migrate_legacy_entity(coordinator: TeleinfoCoordinator, meter_id: str) -> None:
+    """Move the legacy total energy sensor to the EAST sensor of the meter."""
+    if coordinator.ticmode != TIC_MODE_STANDARD:
+        # Historical meters do not send EAST, the legacy sensor had no data
+        return
+    entity_registry = er.async_get(coordinator.hass)
+    entity_id = entity_registry.async_get_entity_id(
+        Platform.SENSOR, DOMAIN, LEGACY_TOTAL_ENERGY_UNIQUE_ID
+    )
+    if entity_id is None:
+        return
+    unique_id = f"teleinfo-{meter_id}-{LEGACY_TOTAL_ENERGY_KEY}"
+    if entity_registry.async_get_entity_id(Platform.SENSOR, DOMAIN, unique_id) is not None:
+        return
+    _LOGGER.info("Migrating %s to the unique id %s", entity_id, unique_id)
+    entity_registry.async_update_entity(entity_id, new_unique_id=unique_id)
 
-    @property
-    def should_poll(self) -> bool:
-        """Do not poll for those entities"""
-        return False
 
-    @property
-    def state_class(self):
-        return SensorStateClass.TOTAL_INCREASING
+def _meter_model(coordinator: TeleinfoCoordinator) -> str:
+    """Return the model of a meter from its profile."""
+    model = "Compteur triphasé" if coordinator.three_phase else "Compteur monophasé"
+    if coordinator.producer:
+        model += " producteur"
+    return f"{model}, mode {coordinator.ticmode}"
 
-    @property
-    def device_class(self):
-        return SensorDeviceClass.ENERGY
 
-    @property
-    def native_unit_of_measurement(self) -> str | None:
-        return UnitOfEnergy.WATT_HOUR
+class TeleinfoSensorEntity(RestoreSensor):
+    """Representation of a Teleinfo label sensor."""
 
-    @property
-    def icon(self):
-        return "mdi:counter"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, TELEINFO_TOTAL_ENERGY_KEY)},
-            name=self._attr_name,
-            manufacturer=DEVICE_MANUFACTURER,
-            model=DOMAIN,
-        )
-        
-class TeleinfoStringSensorEntity(SensorEntity):
-    """Representation of a Teleinfo Integer sensor."""
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    entity_description: TeleinfoLabel
 
     def __init__(
         self,
-        name,
-        key,
-        state_class,
-        device_class,
-        unit,
-        icon
+        coordinator,
+        meter_id,
+        device_info,
+        label,
+        write_filter=None,
+        name_prefix=None,
     ) -> None:
         """Initialize"""
-        self._attr_has_entity_name = True
-        self._attr_name = name
+        self.entity_description = label
+        self._attr_unique_id = f"teleinfo-{meter_id}-{label.key}"
+        if name_prefix is not None:
+            self._attr_name = f"{name_prefix} {label.name}"
+        self._attr_device_info = device_info
         self._attr_native_value = None
-        self._key = key
-        self._state_class = state_class
-        self._device_class = device_class
-        self._unit = unit
-        self._icon = icon
-
-        self._attributes = {
-            ATTR_ATTRIBUTION: CONF_ATTRIBUTION,
-        }
+        self._coordinator = coordinator
+        self._key = label.key
+        self._convert = label.converter
+        self._decode_attributes = label.attributes
+        self._monotonic = label.state_class == SensorStateClass.TOTAL_INCREASING
+        self._suspect_updates = 0
+        # The last value comes from the previous run, the time since it is unknown
+        self._restored = False
+        self._raw_value = None
+        self._aggregate = None
+        self._last_write = 0.0
+        self._deadband = 0
+        self._min_interval = 0
+        if write_filter is not None:
+            self._deadband = write_filter[CONF_DEADBAND]
+            self._min_interval = write_filter[CONF_MIN_INTERVAL]
 
-    @callback
     async def async_added_to_hass(self) -> None:
         """Handle when an entity is about to be added to Home Assistant."""
-       
-        listener_cancel = self.hass.bus.async_listen(
-            "teleinfo_"+ self._key +"_read_event",
-            self._on_event,
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.async_add_listener(self._key, self._on_update)
         )
-        
-        self.async_on_remove(listener_cancel)
+        self.async_on_remove(
+            self._coordinator.async_add_availability_listener(self.async_write_ha_state)
+        )
+        if self._key in self._coordinator.data:
+            self._on_update()
+        elif (last_data := await self.async_get_last_sensor_data()) is not None:
+            self._attr_native_value = last_data.native_value
+            self._restored = True
 
     @callback
-    async def _on_event(self, event: Event):
-        self._attr_native_value = event.data['value']
-        self.async_write_ha_state()
+    def _on_update(self) -> None:
+        # Aggregates are published once per refresh window, whatever the filters
+        aggregate = self._coordinator.aggregates.get(self._key)
+        write = aggregate is not self._aggregate
+        if write:
+            self._aggregate = aggregate
+            self._attr_extra_state_attributes = aggregate
+
+        # The label may be missing from the last frame of an aggregated window
+        if self._key in self._coordinator.data:
+            raw_value, _ = self._coordinator.data[self._key]
+            if raw_value != self._raw_value and self._update_value(raw_value):
+                write = True
+
+        if write:
+            self._coordinator.state_writes += 1
+            self.async_write_ha_state()
+        else:
+            self._coordinator.skipped_writes += 1
 
-    @property
-    def should_poll(self) -> bool:
-        """Do not poll for those entities"""
+    def _update_value(self, raw_value) -> bool:
+        """Update the value unless the write filter drops it, return True if updated."""
+        now = time.monotonic()
+        if self._min_interval and now - self._last_write < self._min_interval:
+            return False
+
+        try:
+            value = self._convert(raw_value)
+            attributes = self._decode_attributes and self._decode_attributes(raw_value)
+        except ValueError:
+            _LOGGER.debug("Invalid value for %s: %r", self._key, raw_value)
+            return False
+        if (
+            self._deadband
+            and isinstance(value, (int, float))
+            and isinstance(self._attr_native_value, (int, float))
+            and abs(value - self._attr_native_value) <= self._deadband
+        ):
+            return False
+
+        if self._monotonic and not self._check_index(value, now):
+            return False
+
+        self._raw_value = raw_value
+        self._attr_native_value = value
+        self._restored = self._coordinator.restored
+        if attributes is not None:
+            self._attr_extra_state_attributes = attributes
+        self._last_write = now
+        return True
+
+    def _check_index(self, value, now) -> bool:
+        """Return True if an energy index value is plausible, or confirmed."""
+        previous = self._attr_native_value
+        if previous is None:
+            return True
+        increase = value - previous
+        if increase >= 0 and (
+            self._restored or increase <= ENERGY_MAX_RATE * (now - self._last_write + 1)
+        ):
+            self._suspect_updates = 0
+            return True
+
+        self._suspect_updates += 1
+        if self._suspect_updates >= ENERGY_CONFIRMATIONS:
+            _LOGGER.warning("Index %s changed from %d to %d", self._key, previous, value)
+            self._suspect_updates = 0
+            return True
+
+        _LOGGER.debug("Rejecting index %s change from %d to %d", self._key, previous, value)
+        self._coordinator.rejected_values += 1
         return False
 
     @property
-    def state_class(self):
-        return self._state_class
+    def available(self) -> bool:
+        """Return False while the meter is disconnected."""
+        return self._coordinator.available
 
-    @property
-    def device_class(self):
-        return self._device_class
 
-    @property
-    def native_unit_of_measurement(self) -> str | None:
-        return self._unit
+class TeleinfoDiagnosticSensorEntity(SensorEntity):
+    """Representation of a Teleinfo reader counter."""
 
-    @property
-    def icon(self):
-        return self._icon
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    entity_description: TeleinfoDiagnosticDescription
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            entry_type=DeviceEntryType.SERVICE,
-            identifiers={(DOMAIN, self._key)},
-            name=self._attr_name,
-            manufacturer=DEVICE_MANUFACTURER,
-            model=DOMAIN,
+    def __init__(self, coordinator, meter_id, device_info, description, name_prefix=None) -> None:
+        """Initialize"""
+        self.entity_description = description
+        self._attr_unique_id = f"teleinfo-{meter_id}-{description.key}"
+        if name_prefix is not None:
+            self._attr_name = f"{name_prefix} {description.name}"
+        self._attr_device_info = device_info
+        self._attr_native_value = None
+        self._coordinator = coordinator
+        self._source = coordinator if description.source == 'coordinator' else coordinator.reader
+        self._key = description.key
+
+    async def async_added_to_hass(self) -> None:
+        """Handle when an entity is about to be added to Home Assistant."""
+        self.async_on_remove(
+            self._coordinator.async_add_listener(None, self._on_update)
         )
-        
-class TeleinfoIntegerSensorEntity(TeleinfoStringSensorEntity):
-    """Representation of a Teleinfo Integer sensor."""
+        self._on_update()
 
     @callback
-    async def _on_event(self, event: Event):
-        self._attr_native_value = int(event.data['value'])
-        self.async_write_ha_state()
\ No newline at end of file
+    def _on_update(self) -> None:
+        if self.entity_description.value_fn is not None:
+            value = self.entity_description.value_fn(self._source)
+        else:
+            value = getattr(self._source, self._key)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
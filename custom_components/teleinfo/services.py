@@ -0,0 +1,83 @@
+"""Teleinfo services."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SERVICE_GET_HISTORY
+from .scheduler import async_get_scheduler
+
+ATTR_KEY = "key"
+ATTR_METER_ID = "meter_id"
+ATTR_SINCE = "since"
+ATTR_UNTIL = "until"
+ATTR_RESOLUTION = "resolution"
+
+GET_HISTORY_SCHEMA = vol.Schema({
+    vol.Required(ATTR_KEY): cv.string,
+    vol.Optional(ATTR_METER_ID): cv.string,
+    vol.Optional(ATTR_SINCE): cv.datetime,
+    vol.Optional(ATTR_UNTIL): cv.datetime,
+    vol.Optional(ATTR_RESOLUTION, default=0): cv.positive_int,
+})
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Teleinfo services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_HISTORY):
+        return
+
+    @callback
+    def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return the downsampled recent values of a label."""
+        meter_id = call.data.get(ATTR_METER_ID)
+        coordinators = [
+            coordinator
+            for coordinator in async_get_scheduler(hass).coordinators
+            if coordinator.history is not None
+            and (meter_id is None or coordinator.meter_id == meter_id)
+        ]
+        if not coordinators:
+            raise ServiceValidationError(f"No Teleinfo meter with a history: {meter_id}")
+        coordinator = coordinators[0]
+
+        since = call.data.get(ATTR_SINCE)
+        until = call.data.get(ATTR_UNTIL)
+        points = coordinator.history.query(
+            call.data[ATTR_KEY],
+            None if since is None else dt_util.as_timestamp(since),
+            None if until is None else dt_util.as_timestamp(until),
+            call.data[ATTR_RESOLUTION],
+        )
+        return {
+            "meter_id": coordinator.meter_id,
+            "key": call.data[ATTR_KEY],
+            "points": [
+                {
+                    "time": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                    "mean": mean,
+                    "min": low,
+                    "max": high,
+                }
+                for timestamp, mean, low, high in points
+            ],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
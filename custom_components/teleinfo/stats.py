@@ -0,0 +1,52 @@
+"""Cheap timing statistics of the read path.
+
+A histogram only costs a few integer operations per sample: the durations are
+counted in power of two buckets of microseconds, so that they can be left on
+in production and dumped in the diagnostics.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+# Durations up to 2 ** (BUCKETS - 2) us, about 17 min, longer ones share the
+# last bucket.
+BUCKETS = 32
+
+
+class TimingHistogram:
+    """Count, total, max and power of two distribution of durations."""
+
+    __slots__ = ("count", "total", "max", "_buckets")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets = [0] * BUCKETS
+
+    def add(self, duration: float) -> None:
+        """Add a duration, in seconds."""
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self._buckets[min(int(duration * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration in milliseconds, None without samples."""
+        if not self.count:
+            return None
+        return round(self.total / self.count * 1000, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics, in milliseconds, and the non-empty buckets."""
+        return {
+            "count": self.count,
+            "mean_ms": self.mean,
+            "max_ms": round(self.max * 1000, 3),
+            "buckets_us": {
+                f"<{1 << index}": count for index, count in enumerate(self._buckets) if count
+            },
+        }
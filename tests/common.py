@@ -0,0 +1,44 @@
+"""Helpers of the Teleinfo tests run against Home Assistant."""
+from custom_components.teleinfo.parser import TeleinfoFrameParser
+from custom_components.teleinfo.replay import ReplayReader, sample_frame
+from custom_components.teleinfo.sensor import TeleinfoSensorEntity
+
+
+class RecordingSensorEntity(TeleinfoSensorEntity):
+    """Label sensor recording the values it writes instead of writing them."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the sensor."""
+        super().__init__(*args, **kwargs)
+        self.writes = []
+
+    def async_write_ha_state(self) -> None:
+        """Record the value."""
+        self.writes.append(self._attr_native_value)
+
+
+def receive_frame(coordinator, groups, refresh=True):
+    """Receive a frame of (label, horodate, value) groups, and publish it on a refresh tick."""
+    data = bytes(sample_frame(coordinator.ticmode, 0, 0, groups))
+    (frame,) = TeleinfoFrameParser().feed(data)
+    coordinator.reader.receive(frame)
+    if refresh:
+        coordinator.async_refresh()
+
+
+class StandInReader(ReplayReader):
+    """Reader stand-in which can be started and stopped by the scheduler."""
+
+    def __init__(self, ticmode: str, port: str) -> None:
+        """Initialize the reader."""
+        super().__init__(ticmode)
+        self.port = port
+        self.started = False
+
+    def start(self) -> None:
+        """Start reading."""
+        self.started = True
+
+    async def stop(self) -> None:
+        """Stop reading."""
+        self.started = False
@@ -0,0 +1,56 @@
+"""Fixtures of the Teleinfo tests run against Home Assistant."""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.teleinfo import sensor
+from custom_components.teleinfo.coordinator import TeleinfoCoordinator
+from custom_components.teleinfo.replay import ReplayReader
+
+
+class Clock:
+    """Monotonic clock of the sensors, moved by hand."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Return the clock of the write filters and index guard of the sensors."""
+    sensor_clock = Clock()
+    monkeypatch.setattr(sensor, "time", SimpleNamespace(monotonic=sensor_clock))
+    return sensor_clock
+
+
+@pytest.fixture
+def ticmode():
+    """Return the TIC mode of the meter."""
+    return "standard"
+
+
+@pytest.fixture
+def coordinator_options():
+    """Return the options of the coordinator."""
+    return {}
+
+
+@pytest.fixture
+async def coordinator(hass, ticmode, coordinator_options):
+    """Return a coordinator of a stand-in reader."""
+    teleinfo_coordinator = TeleinfoCoordinator(
+        hass,
+        ReplayReader(ticmode),
+        ticmode,
+        datetime.timedelta(seconds=30),
+        **coordinator_options,
+    )
+    yield teleinfo_coordinator
+    # Also cancels the delayed save of the snapshot
+    await teleinfo_coordinator.async_save_snapshot()
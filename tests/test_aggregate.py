@@ -0,0 +1,36 @@
+"""Tests of the running aggregates of the refresh windows."""
+from custom_components.teleinfo.aggregate import WindowAggregate
+
+
+def test_summary():
+    """The summary covers every value since the last clear."""
+    aggregate = WindowAggregate()
+    for value in (750, 9000, 120, 800):
+        aggregate.append(value)
+    assert aggregate.summary() == {
+        "min": 120, "max": 9000, "mean": 2667.5, "last": 800, "count": 4,
+    }
+
+
+def test_long_window():
+    """A spike at the start of a window of any length is kept."""
+    aggregate = WindowAggregate()
+    aggregate.append(12000)
+    for _ in range(1000):
+        aggregate.append(500)
+    summary = aggregate.summary()
+    assert summary["max"] == 12000
+    assert summary["min"] == 500
+    assert summary["count"] == 1001
+    assert summary["mean"] == round((12000 + 500 * 1000) / 1001, 1)
+
+
+def test_clear():
+    """A cleared aggregate starts over from the next value."""
+    aggregate = WindowAggregate()
+    aggregate.append(9000)
+    aggregate.append(100)
+    aggregate.clear()
+    assert aggregate.count == 0
+    aggregate.append(500)
+    assert aggregate.summary() == {"min": 500, "max": 500, "mean": 500, "last": 500, "count": 1}
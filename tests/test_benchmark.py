@@ -0,0 +1,62 @@
+"""Benchmarks of the read path stages: parsing, checksums and label dispatch.
+
+Run with --benchmark-only, and compare to a saved run with --benchmark-compare
+to catch a regression.
+"""
+import pytest
+
+from custom_components.teleinfo.checksum import validate_frame
+from custom_components.teleinfo.const import TELEINFO_LABELS
+from custom_components.teleinfo.coordinator import decode_frame
+from custom_components.teleinfo.parser import TeleinfoFrameParser
+from custom_components.teleinfo.replay import sample_capture
+
+FRAMES = 100
+
+
+@pytest.fixture(params=["historical", "standard"])
+def ticmode(request):
+    """Return each TIC mode."""
+    return request.param
+
+
+@pytest.fixture
+def capture(ticmode):
+    """Return synthetic frames of the mode."""
+    return sample_capture(ticmode, FRAMES)
+
+
+@pytest.fixture
+def frames(capture):
+    """Return the parsed frames of the capture."""
+    return TeleinfoFrameParser().feed(capture)
+
+
+def test_parse(benchmark, capture):
+    """Parse the capture, fed in 64 byte chunks like a serial port."""
+    chunks = [capture[start:start + 64] for start in range(0, len(capture), 64)]
+
+    def parse():
+        parser = TeleinfoFrameParser()
+        return [frame for chunk in chunks for frame in parser.feed(chunk)]
+
+    assert len(benchmark(parse)) == FRAMES
+
+
+def test_checksum(benchmark, frames):
+    """Validate the groups of the frames."""
+
+    def validate():
+        return sum(validate_frame(frame)[1] for frame in frames)
+
+    assert benchmark(validate) == 0
+
+
+def test_decode(benchmark, ticmode, frames):
+    """Decode the known labels of the frames."""
+    labels = TELEINFO_LABELS[ticmode]
+
+    def decode():
+        return [decode_frame(frame, labels) for frame in frames]
+
+    assert all(benchmark(decode))
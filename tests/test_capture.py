@@ -0,0 +1,74 @@
+"""Tests of the raw capture to rotating gzip files."""
+import asyncio
+import os
+
+import pytest
+
+from custom_components.teleinfo import capture as capture_module
+from custom_components.teleinfo.capture import TeleinfoCapture, read_capture
+from custom_components.teleinfo.replay import load_capture, sample_frame
+
+
+@pytest.fixture(autouse=True)
+def flush_each_write(monkeypatch):
+    """Write every recorded chunk as its own batch."""
+    monkeypatch.setattr(capture_module, "FLUSH_SIZE", 1)
+
+
+async def test_round_trip(tmp_path):
+    """The recorded chunks are read back in order with increasing times."""
+    path = str(tmp_path / "teleinfo.tic")
+    capture = TeleinfoCapture(path)
+    chunks = [bytes(sample_frame("standard", number, 750)) for number in range(3)]
+    for chunk in chunks:
+        capture.write(chunk)
+    await capture.async_close()
+
+    records = read_capture(path)
+    assert [data for _, data in records] == chunks
+    assert [timestamp for timestamp, _ in records] == sorted(timestamp for timestamp, _ in records)
+    assert capture.bytes_captured == sum(len(chunk) for chunk in chunks)
+    assert load_capture(path) == b''.join(chunks)
+
+
+async def test_rotation(tmp_path):
+    """Full files are shifted to the backups, the oldest ones are dropped."""
+    path = str(tmp_path / "teleinfo.tic")
+    # Two 60 byte chunks fill a file
+    capture = TeleinfoCapture(path, max_bytes=100, backup_count=2)
+    chunks = [bytes([65 + number]) * 60 for number in range(8)]
+    for chunk in chunks:
+        capture.write(chunk)
+    await capture.async_close()
+
+    assert not os.path.exists(f"{path}.3")
+    files = [f"{path}.2", f"{path}.1", path]
+    assert [[data for _, data in read_capture(name)] for name in files] == [
+        chunks[2:4], chunks[4:6], chunks[6:8],
+    ]
+
+
+def test_not_a_capture(tmp_path):
+    """A file without the capture header is rejected."""
+    path = tmp_path / "teleinfo.tic"
+    path.write_bytes(b"\x02\nADCO 031762120162 A\r\x03")
+    with pytest.raises(ValueError):
+        read_capture(str(path))
+
+
+async def test_readable_before_close(tmp_path):
+    """The written batches can be read back from a file left open, as after a crash."""
+    path = str(tmp_path / "teleinfo.tic")
+    capture = TeleinfoCapture(path)
+    chunks = [bytes(sample_frame("historical", number, 750)) for number in range(3)]
+    for chunk in chunks:
+        capture.write(chunk)
+
+    records = []
+    async with asyncio.timeout(5):
+        while len(records) < len(chunks):
+            await asyncio.sleep(0.01)
+            if os.path.exists(path):
+                records = read_capture(path)
+    assert [data for _, data in records] == chunks
+    await capture.async_close()
@@ -0,0 +1,56 @@
+"""Tests of the group checksums, method A and method B."""
+from custom_components.teleinfo.checksum import compute_checksum, validate_frame
+from custom_components.teleinfo.parser import HT, SP, TeleinfoFrameParser, parse_group
+from custom_components.teleinfo.replay import sample_capture
+
+
+def test_method_a():
+    """Method A sums the label and value without the last separator."""
+    assert compute_checksum(b'IINST 002 Y', SP) == ord('Y')
+    assert compute_checksum(b'PAPP 00750 -', SP) == ord('-')
+
+
+def test_method_b():
+    """Method B includes the separator preceding the checksum."""
+    assert compute_checksum(b'SINSTS\t00750\tR', HT) == ord('R')
+    assert compute_checksum(b'SMAXSN\tH081225070000\t07196\t=', HT) == ord('=')
+
+
+def test_methods_differ():
+    """A group is only valid with the method of its separator."""
+    group = parse_group(b'IINST 002 Y')
+    assert compute_checksum(group.raw, HT) != group.checksum
+
+
+def test_validate_frame():
+    """Invalid groups are dropped and counted."""
+    frame = tuple(
+        parse_group(raw)
+        for raw in (b'IINST 002 Y', b'IINST 003 Y', b'PAPP 00750 -', b'PAPP 00750 .')
+    )
+    valid, invalid = validate_frame(frame)
+    assert [g.raw for g in valid] == [b'IINST 002 Y', b'PAPP 00750 -']
+    assert invalid == 2
+
+
+def test_validate_sample_capture():
+    """The synthetic frames are valid, their corrupted groups are not."""
+    for ticmode in ('historical', 'standard'):
+        parser = TeleinfoFrameParser()
+        assert all(
+            validate_frame(frame)[1] == 0 for frame in parser.feed(sample_capture(ticmode, 10))
+        )
+        corrupted = parser.feed(sample_capture(ticmode, 10, corrupt=1.0))
+        assert all(not validate_frame(frame)[0] for frame in corrupted)
+
+
+def test_validate_frame_bit7():
+    """A flipped bit 7 keeps the checksum but the group is dropped."""
+    raw = bytearray(b'SINSTS\t00750\tR')
+    raw[9] |= 0x80
+    raw = bytes(raw)
+    group = parse_group(raw)
+    assert compute_checksum(raw, HT) == group.checksum
+    valid, invalid = validate_frame((parse_group(b'IINST 002 Y'), group))
+    assert [g.raw for g in valid] == [b'IINST 002 Y']
+    assert invalid == 1
@@ -0,0 +1,60 @@
+"""Tests of the config flow."""
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    mock_platform,
+)
+import pytest
+
+from custom_components.teleinfo import config_flow
+from custom_components.teleinfo.const import (
+    CONF_AGGREGATES,
+    CONF_COUNTERTYPE,
+    CONF_DEVICE,
+    CONF_EVENTS,
+    CONF_HISTORY,
+    CONF_LIVE,
+    CONF_REFRESH,
+    DOMAIN,
+    TELEINFO_EVENTS_FRAME,
+    TELEINFO_EVENTS_NONE,
+)
+
+
+@pytest.fixture(autouse=True)
+def integration(hass):
+    """Stand in for the integration around its config flow platform."""
+    mock_platform(hass, f"{DOMAIN}.config_flow", config_flow)
+
+
+async def test_options_flow(hass):
+    """The options flow shows the current options and saves the submitted ones."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_DEVICE: "/dev/ttyUSB0", CONF_COUNTERTYPE: "standard"},
+        options={CONF_REFRESH: 60},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "init"
+    defaults = {key.schema: key.default() for key in result["data_schema"].schema}
+    assert defaults == {
+        CONF_REFRESH: 60,
+        CONF_EVENTS: TELEINFO_EVENTS_NONE,
+        CONF_LIVE: False,
+        CONF_AGGREGATES: False,
+        CONF_HISTORY: 0,
+    }
+
+    options = {
+        CONF_REFRESH: 10,
+        CONF_EVENTS: TELEINFO_EVENTS_FRAME,
+        CONF_LIVE: True,
+        CONF_AGGREGATES: False,
+        CONF_HISTORY: 3600,
+    }
+    result = await hass.config_entries.options.async_configure(result["flow_id"], options)
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options == options
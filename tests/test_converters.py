@@ -0,0 +1,76 @@
+"""Tests of the decoders of the structured labels."""
+import pytest
+
+from custom_components.teleinfo import converters
+
+
+def test_stge():
+    """Each status field is decoded from its bits."""
+    status = converters.stge('013A0401')
+    assert status == {
+        'dry_contact_open': True,
+        'breaker': 'closed',
+        'terminal_cover_open': False,
+        'overvoltage': False,
+        'reference_power_exceeded': False,
+        'producer': False,
+        'negative_active_energy': False,
+        'supplier_index': 2,
+        'distributor_index': 1,
+        'clock_degraded': False,
+        'standard_mode': True,
+        'euridis': 3,
+        'cpl_status': 1,
+        'cpl_synchronized': False,
+        'tempo_today': 'blue',
+        'tempo_tomorrow': None,
+        'mobile_peak_notice': 0,
+        'mobile_peak': 0,
+    }
+
+
+def test_stge_fields():
+    """Single bits and multi-bit fields land in their own status field."""
+    assert converters.stge('00000002')['breaker'] == 'open_overpower'
+    # Bits 1 to 3 at 7 are not a breaker state
+    assert converters.stge('0000000E')['breaker'] is None
+    assert converters.stge('00000080')['reference_power_exceeded']
+    assert converters.stge('00000100')['producer']
+    assert converters.stge('00003C00')['supplier_index'] == 16
+    assert converters.stge('0000C000')['distributor_index'] == 4
+    status = converters.stge('0B000000')
+    assert (status['tempo_today'], status['tempo_tomorrow']) == ('red', 'white')
+    status = converters.stge('C0000000')
+    assert (status['mobile_peak_notice'], status['mobile_peak']) == (0, 3)
+
+
+def test_stge_invalid():
+    """A register which is not hexadecimal is rejected."""
+    with pytest.raises(ValueError):
+        converters.stge('0G000000')
+
+
+def test_schedule():
+    """The unused blocks of a day profile are skipped."""
+    assert converters.schedule('00004001 06004002 22004001 NONUTILE NONUTILE') == {
+        'schedule': [
+            {'start': '00:00', 'index': 1, 'code': '4001'},
+            {'start': '06:00', 'index': 2, 'code': '4002'},
+            {'start': '22:00', 'index': 1, 'code': '4001'},
+        ]
+    }
+    assert converters.schedule('NONUTILE ' * 11) == {'schedule': []}
+
+
+def test_ptec():
+    """The padding dots are dropped, an unknown period is None."""
+    assert converters.ptec('HP..') == 'hp'
+    assert converters.ptec('HCJB') == 'hcjb'
+    assert converters.ptec('XX..') is None
+
+
+def test_text():
+    """The padding of the free texts is dropped, inner spaces are collapsed."""
+    assert converters.text('    HP  BLEU    ') == 'HP BLEU'
+    assert converters.text('      TEMPO     ') == 'TEMPO'
+    assert converters.text('PAS DE          MESSAGE         ') == 'PAS DE MESSAGE'
@@ -0,0 +1,190 @@
+"""Tests of the coordinator: live mode, snapshot restore and labels sent by the meter."""
+import datetime
+import time
+
+import pytest
+
+from custom_components.teleinfo import sensor
+from custom_components.teleinfo.const import TELEINFO_LABELS
+from custom_components.teleinfo.coordinator import SNAPSHOT_MAX_AGE, TeleinfoCoordinator
+from custom_components.teleinfo.replay import ReplayReader
+
+from .common import RecordingSensorEntity, receive_frame
+
+METER_ID = "21490012345678"
+
+
+@pytest.fixture
+def add_sensor(coordinator):
+    """Return a function subscribing a sensor of a standard label to the coordinator."""
+
+    def _add_sensor(key):
+        description = TELEINFO_LABELS["standard"][key.encode("ascii")]
+        entity = RecordingSensorEntity(coordinator, METER_ID, None, description)
+        coordinator.async_add_listener(key, entity._on_update)
+        return entity
+
+    return _add_sensor
+
+
+@pytest.mark.parametrize("coordinator_options", [{"live": True}])
+async def test_live_labels_written_on_every_frame(coordinator, add_sensor):
+    """Live labels are written on every frame, the other labels on the refresh tick."""
+    power = add_sensor("SINSTS")
+    index = add_sensor("EAST")
+    receive_frame(coordinator, [("PRM", None, METER_ID), ("SINSTS", None, "00500")])
+
+    for value in ("00600", "00700", "00800"):
+        receive_frame(
+            coordinator,
+            [("PRM", None, METER_ID), ("EAST", None, "000001000"), ("SINSTS", None, value)],
+            refresh=False,
+        )
+    assert power.writes == [600, 700, 800]
+    assert index.writes == []
+    assert coordinator.live_frames == 3
+
+    coordinator.async_refresh()
+    assert index.writes == [1000]
+    # Not written again by the tick
+    assert power.writes == [600, 700, 800]
+
+
+async def test_live_labels_on_refresh_without_live_mode(coordinator, add_sensor):
+    """Without live mode, the instantaneous labels wait for the refresh tick."""
+    power = add_sensor("SINSTS")
+    receive_frame(coordinator, [("PRM", None, METER_ID), ("SINSTS", None, "00500")])
+    for value in ("00600", "00700"):
+        receive_frame(coordinator, [("SINSTS", None, value)], refresh=False)
+    assert power.writes == [500]
+    coordinator.async_refresh()
+    assert power.writes == [500, 700]
+    assert coordinator.live_frames == 0
+
+
+def snapshot(**fields):
+    """Return a snapshot of the meter saved now, with fields replaced, or removed if None."""
+    saved = {
+        "saved": time.time(),
+        "meter_id": METER_ID,
+        "keys": ["EAST", "PRM"],
+        "data": {"EAST": "012345678", "PRM": METER_ID},
+    }
+    saved.update(fields)
+    return {field: value for field, value in saved.items() if value is not None}
+
+
+def store_snapshot(hass_storage, data):
+    """Store the snapshot of the stand-in reader of a standard meter."""
+    key = "teleinfo.replay_standard"
+    hass_storage[key] = {"version": 1, "key": key, "data": data}
+
+
+async def test_restore_after_restart(hass, hass_storage, coordinator):
+    """The snapshot saved before a restart is served until the first frame."""
+    receive_frame(coordinator, [("PRM", None, METER_ID), ("EAST", None, "012345678")])
+    await coordinator.async_save_snapshot()
+
+    # Restart
+    restarted = TeleinfoCoordinator(
+        hass, ReplayReader("standard"), "standard", datetime.timedelta(seconds=30)
+    )
+    restarted.reader.available = False
+    entities = []
+    sensor._async_add_meter_entities(restarted, entities.extend, {})
+    await restarted._async_restore()
+
+    assert restarted.meter_id == METER_ID
+    assert restarted.restored
+    assert restarted.available
+    assert {"teleinfo-21490012345678-EAST", "teleinfo-21490012345678-PRM"} <= {
+        entity.unique_id for entity in entities
+    }
+    index = RecordingSensorEntity(
+        restarted, METER_ID, None, TELEINFO_LABELS["standard"][b"EAST"]
+    )
+    restarted.async_add_listener("EAST", index._on_update)
+    index._on_update()
+    assert index.writes == [12345678]
+
+    restarted.reader.available = True
+    receive_frame(restarted, [("PRM", None, METER_ID), ("EAST", None, "012345680")])
+    assert not restarted.restored
+    assert index.writes == [12345678, 12345680]
+    await restarted.async_save_snapshot()
+
+
+async def test_stale_snapshot_ignored(hass_storage, coordinator):
+    """A snapshot saved too long before the restart is not served."""
+    store_snapshot(hass_storage, snapshot(saved=time.time() - SNAPSHOT_MAX_AGE - 1))
+    await coordinator._async_restore()
+    assert not coordinator.restored
+    assert coordinator.meter_id is None
+    assert coordinator.data == {}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        ["EAST", "012345678"],
+        snapshot(saved=None),
+        snapshot(saved="now"),
+        snapshot(meter_id=None),
+        snapshot(meter_id=21490012345678),
+        snapshot(keys=None),
+        snapshot(keys="EAST"),
+        snapshot(data=[["EAST", "012345678"]]),
+        snapshot(data={"EAST": 12345678}),
+    ],
+)
+async def test_malformed_snapshot_ignored(hass_storage, coordinator, data):
+    """A snapshot missing a field, or with a field of the wrong type, is not served."""
+    store_snapshot(hass_storage, data)
+    await coordinator._async_restore()
+    assert not coordinator.restored
+    assert coordinator.meter_id is None
+
+
+async def test_valid_snapshot_restored(hass_storage, coordinator):
+    """A snapshot saved before the restart is served."""
+    store_snapshot(hass_storage, snapshot())
+    await coordinator._async_restore()
+    assert coordinator.restored
+    assert coordinator.meter_id == METER_ID
+    assert coordinator.data == {"EAST": ("012345678", None), "PRM": (METER_ID, None)}
+
+
+async def test_late_label_creates_entity(coordinator, add_sensor):
+    """A label first sent in a later frame gets its entity, and the profile is updated."""
+    entities = []
+    sensor._async_add_meter_entities(coordinator, entities.extend, {})
+    receive_frame(coordinator, [("PRM", None, METER_ID), ("URMS1", None, "232")])
+    assert not coordinator.three_phase
+    assert "teleinfo-21490012345678-URMS3" not in {entity.unique_id for entity in entities}
+
+    voltage = add_sensor("URMS3")
+    receive_frame(
+        coordinator,
+        [("PRM", None, METER_ID), ("URMS1", None, "232"), ("URMS3", None, "229")],
+    )
+    assert coordinator.three_phase
+    assert "teleinfo-21490012345678-URMS3" in {entity.unique_id for entity in entities}
+    assert voltage.writes == [229]
+
+
+async def test_labels_never_sent(coordinator):
+    """Only the labels sent by the meter get entities, the others are never dispatched."""
+    entities = []
+    sensor._async_add_meter_entities(coordinator, entities.extend, {})
+    dispatched = []
+    coordinator.async_add_listener("EAIT", lambda: dispatched.append("EAIT"))
+    for value in ("012345678", "012345679"):
+        receive_frame(coordinator, [("PRM", None, METER_ID), ("EAST", None, value)])
+
+    assert {
+        entity.entity_description.key
+        for entity in entities
+        if isinstance(entity, sensor.TeleinfoSensorEntity)
+    } == {"PRM", "EAST"}
+    assert dispatched == []
+    assert not coordinator.producer
@@ -0,0 +1,90 @@
+"""Tests of the meter emulator, read through its pseudo-terminal."""
+import asyncio
+import os
+import termios
+
+import pytest
+
+from custom_components.teleinfo.checksum import validate_frame
+from custom_components.teleinfo.emulator import TeleinfoEmulator, main
+from custom_components.teleinfo.parser import TeleinfoFrameParser
+from custom_components.teleinfo.reader import TeleinfoReader
+
+
+def read_frames(path, count):
+    """Return the first count frames read on the port."""
+    parser = TeleinfoFrameParser()
+    frames = []
+    with open(path, "rb", buffering=0) as port:
+        while len(frames) < count:
+            frames += parser.feed(port.read(4096))
+    return frames[:count]
+
+
+def supports_7e1(path):
+    """Return True if the pty accepts the 7E1 settings of the reader."""
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    try:
+        attributes = termios.tcgetattr(fd)
+        attributes[2] = attributes[2] & ~termios.CSIZE | termios.CS7 | termios.PARENB
+        termios.tcsetattr(fd, termios.TCSANOW, attributes)
+    except termios.error:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+@pytest.mark.parametrize("ticmode", ["historical", "standard"])
+def test_frames_are_valid(ticmode):
+    """The emulated frames are complete and pass the checksums."""
+    emulator = TeleinfoEmulator(ticmode, speed=10, seed=0)
+    path = emulator.open()
+    emulator.start()
+    try:
+        frames = read_frames(path, 3)
+    finally:
+        emulator.close()
+    assert all(frame and not validate_frame(frame)[1] for frame in frames)
+
+
+async def test_reader_decodes_frames():
+    """The reader receives the emulated frames on the pty."""
+    emulator = TeleinfoEmulator("standard", speed=10, seed=0)
+    path = emulator.open()
+    if not supports_7e1(path):
+        emulator.close()
+        pytest.skip("The ptys of this kernel reject the 7E1 settings")
+    reader = TeleinfoReader(path, "standard")
+    emulator.start()
+    reader.start()
+    try:
+        async with asyncio.timeout(10):
+            while reader.frames_received < 3:
+                await asyncio.sleep(0.05)
+    finally:
+        await reader.stop()
+        emulator.close()
+    assert reader.invalid_groups == 0
+    assert {b'PRM', b'EAST', b'SINSTS'} <= {group.label for group in reader.frame}
+
+
+def test_unthrottled_frames_are_whole():
+    """At speed 0 the frames wait for the reader instead of being cut or dropped."""
+    emulator = TeleinfoEmulator("standard", speed=0, seed=0)
+    path = emulator.open()
+    emulator.start(20)
+    try:
+        frames = read_frames(path, 20)
+    finally:
+        emulator.close()
+    assert emulator.frames_sent == 20
+    assert all(not validate_frame(frame)[1] for frame in frames)
+
+
+def test_negative_speed():
+    """A negative speed is rejected."""
+    with pytest.raises(ValueError):
+        TeleinfoEmulator(speed=-1)
+    with pytest.raises(SystemExit):
+        main(["--speed", "-1"])
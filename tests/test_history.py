@@ -0,0 +1,56 @@
+"""Tests of the history of the numeric labels."""
+from custom_components.teleinfo.history import TeleinfoHistory
+
+
+def test_wrap_around():
+    """Once full, the oldest frames are overwritten and the order is kept."""
+    history = TeleinfoHistory(4)
+    for second in range(6):
+        history.append(1000.0 + second, {'PAPP': 100 * second})
+    assert history.query('PAPP') == [
+        (1000.0 + second, 100 * second, 100 * second, 100 * second) for second in range(2, 6)
+    ]
+
+
+def test_since_until():
+    """Only the frames between since and until, included, are returned."""
+    history = TeleinfoHistory(4)
+    for second in range(6):
+        history.append(1000.0 + second, {'PAPP': second})
+    assert [point[0] for point in history.query('PAPP', 1003.0, 1004.0)] == [1003.0, 1004.0]
+    assert history.query('PAPP', since=1010.0) == []
+
+
+def test_missing_values():
+    """A label missing from a frame, or sent late, leaves a gap."""
+    history = TeleinfoHistory(8)
+    history.append(1.0, {'PAPP': 10})
+    history.append(2.0, {'PAPP': 20, 'ADPS': 45})
+    history.append(3.0, {'PAPP': 30})
+    history.append(4.0, {'ADPS': 46})
+    assert [point[:2] for point in history.query('PAPP')] == [(1.0, 10), (2.0, 20), (3.0, 30)]
+    assert [point[:2] for point in history.query('ADPS')] == [(2.0, 45), (4.0, 46)]
+    assert history.query('IINST') == []
+
+
+def test_downsampling():
+    """Each period gives the mean, min and max of its values, gaps are skipped."""
+    history = TeleinfoHistory(16)
+    for second, value in enumerate([5, 1, 9, 3, None, 10, 20, 30]):
+        history.append(100.0 + second * 5, {} if value is None else {'PAPP': value})
+    assert history.query('PAPP', resolution=10) == [
+        (100.0, 3.0, 1, 5),
+        (110.0, 6.0, 3, 9),
+        (120.0, 10.0, 10, 10),
+        (130.0, 25.0, 20, 30),
+    ]
+
+
+def test_out_of_range_values():
+    """A value which does not fit in 32 bits is kept as a gap instead of raising."""
+    history = TeleinfoHistory(4)
+    history.append(1.0, {'EAST': 2 ** 31})
+    history.append(2.0, {'EAST': 2 ** 31 - 1, 'EAIT': -(2 ** 31)})
+    history.append(3.0, {'EAST': 12, 'EAIT': 10 ** 12})
+    assert [point[:2] for point in history.query('EAST')] == [(2.0, 2 ** 31 - 1), (3.0, 12)]
+    assert history.query('EAIT') == []
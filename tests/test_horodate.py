@@ -0,0 +1,51 @@
+"""Tests of the horodate decoding."""
+import datetime
+
+import pytest
+
+from custom_components.teleinfo.horodate import (
+    METER_TIME_ZONE,
+    SUMMER_TIME,
+    WINTER_TIME,
+    decode_horodate,
+)
+
+
+def test_winter_time():
+    """H is winter time, UTC+1."""
+    assert decode_horodate(b'H081225223518') == datetime.datetime(
+        2008, 12, 25, 22, 35, 18, tzinfo=WINTER_TIME
+    )
+
+
+def test_summer_time():
+    """E is summer time, UTC+2."""
+    decoded = decode_horodate(b'E240701080910')
+    assert decoded == datetime.datetime(2024, 7, 1, 8, 9, 10, tzinfo=SUMMER_TIME)
+    assert decoded.utcoffset() == datetime.timedelta(hours=2)
+
+
+def test_degraded_clock():
+    """The season flag is in lower case when the meter clock is degraded."""
+    assert decode_horodate(b'e240701080910') == decode_horodate(b'E240701080910')
+    assert decode_horodate(b'h081225223518') == decode_horodate(b'H081225223518')
+
+
+def test_unknown_season():
+    """Without a season flag, the meter time zone is used."""
+    assert decode_horodate(b' 240101000000').tzinfo is METER_TIME_ZONE
+
+
+def test_cached():
+    """Identical horodates decode to the same object."""
+    assert decode_horodate(b'H081225070000') is decode_horodate(b'H081225070000')
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [b'', b'H0812252235', b'H08122522351800', b'X081225223518', b'H0812252235AB', b'H081325223518'],
+)
+def test_invalid(raw):
+    """Malformed horodates raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_horodate(raw)
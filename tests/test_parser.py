@@ -0,0 +1,105 @@
+"""Tests of the incremental TIC frame parser."""
+from custom_components.teleinfo.parser import (
+    HT,
+    MAX_FRAME_SIZE,
+    SP,
+    TeleinfoFrameParser,
+    parse_group,
+)
+
+HISTORICAL_FRAME = b'\x02\nADCO 031762120162 6\r\nIINST 002 Y\r\nPAPP 00750 -\r\x03'
+STANDARD_FRAME = (
+    b'\x02\nADSC\t041876097556\tG\r\nSMAXSN\tH081225070000\t07196\t=\r'
+    b'\nSINSTS\t00750\tR\r\x03'
+)
+
+
+def test_historical_groups():
+    """Historical groups have a label, a value and a SP separator."""
+    frames = TeleinfoFrameParser().feed(HISTORICAL_FRAME)
+    assert len(frames) == 1
+    assert [(g.label, g.value, g.horodate) for g in frames[0]] == [
+        (b'ADCO', b'031762120162', None),
+        (b'IINST', b'002', None),
+        (b'PAPP', b'00750', None),
+    ]
+    assert {g.separator for g in frames[0]} == {SP}
+    assert frames[0][1].checksum == ord('Y')
+
+
+def test_standard_groups_with_horodate():
+    """Standard groups may carry a horodate between the label and the value."""
+    (frame,) = TeleinfoFrameParser().feed(STANDARD_FRAME)
+    assert [(g.label, g.value, g.horodate) for g in frame] == [
+        (b'ADSC', b'041876097556', None),
+        (b'SMAXSN', b'07196', b'H081225070000'),
+        (b'SINSTS', b'00750', None),
+    ]
+    assert {g.separator for g in frame} == {HT}
+
+
+def test_value_with_spaces():
+    """Only the first SP separates a historical label from its value."""
+    group = parse_group(b'MOTDETAT 000 000 X')
+    assert group.label == b'MOTDETAT'
+    assert group.value == b'000 000'
+
+
+def test_malformed_groups():
+    """Groups without separator, label or fields are rejected."""
+    assert parse_group(b'AB') is None
+    assert parse_group(b'ADCO-1234-X') is None
+    assert parse_group(b'\t1234\tX') is None
+    assert parse_group(b'A\tB\tC\tD\tX') is None
+
+
+def test_byte_by_byte():
+    """Frames split in any chunks are reassembled."""
+    parser = TeleinfoFrameParser()
+    frames = []
+    for byte in STANDARD_FRAME * 3:
+        frames += parser.feed(bytes((byte,)))
+    assert len(frames) == 3
+    assert frames[0] == frames[2]
+
+
+def test_skips_until_frame_start():
+    """Bytes before the first STX, such as a partial frame, are ignored."""
+    frames = TeleinfoFrameParser().feed(STANDARD_FRAME[20:] + HISTORICAL_FRAME)
+    assert len(frames) == 1
+    assert frames[0][0].label == b'ADCO'
+
+
+def test_interrupted_frame():
+    """A frame aborted by EOT is dropped and counted."""
+    parser = TeleinfoFrameParser()
+    frames = parser.feed(HISTORICAL_FRAME[:20] + b'\x04' + STANDARD_FRAME)
+    assert len(frames) == 1
+    assert frames[0][0].label == b'ADSC'
+    assert parser.dropped_frames == 1
+
+
+def test_missing_frame_end():
+    """A frame without ETX is dropped on the next STX."""
+    parser = TeleinfoFrameParser()
+    frames = parser.feed(HISTORICAL_FRAME[:-1] + STANDARD_FRAME)
+    assert len(frames) == 1
+    assert frames[0][0].label == b'ADSC'
+    assert parser.dropped_frames == 1
+
+
+def test_oversized_frame():
+    """A frame growing past MAX_FRAME_SIZE is dropped."""
+    parser = TeleinfoFrameParser()
+    assert parser.feed(b'\x02' + b'\nA 1 B\r' * (MAX_FRAME_SIZE // 7 + 1)) == []
+    assert parser.dropped_frames == 1
+    assert len(parser.feed(HISTORICAL_FRAME)) == 1
+
+
+def test_reset():
+    """A partial frame is forgotten on reset."""
+    parser = TeleinfoFrameParser()
+    parser.feed(HISTORICAL_FRAME[:-10])
+    parser.reset()
+    assert parser.feed(HISTORICAL_FRAME[-10:]) == []
+    assert len(parser.feed(STANDARD_FRAME)) == 1
@@ -0,0 +1,138 @@
+"""Tests of the reader on a socket:// source, with a local TCP stand-in."""
+import asyncio
+
+import pytest
+
+from custom_components.teleinfo.discovery import _listen
+from custom_components.teleinfo.reader import TeleinfoReader
+from custom_components.teleinfo.replay import sample_frame
+
+
+class TicServer:
+    """TCP server sending a frame to its clients every interval, like a ser2net bridge."""
+
+    def __init__(self, interval: float = 0.05, ticmode: str = "standard") -> None:
+        """Initialize the server."""
+        self.interval = interval
+        self.ticmode = ticmode
+        self.connections = 0
+        self._writers: list[asyncio.StreamWriter] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> str:
+        """Start listening, return the socket:// URL."""
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"socket://127.0.0.1:{port}"
+
+    async def _serve(self, _reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.append(writer)
+        self._tasks.add(asyncio.current_task())
+        number = 0
+        try:
+            while not writer.is_closing():
+                writer.write(sample_frame(self.ticmode, number, 1000 + number))
+                await writer.drain()
+                number += 1
+                await asyncio.sleep(self.interval)
+        except ConnectionError:
+            pass
+
+    def drop_clients(self) -> None:
+        """Close the connections, as a bridge restarting would."""
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        self.drop_clients()
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+@pytest.fixture
+async def server(socket_enabled):
+    """Return a started TIC server."""
+    tic_server = TicServer()
+    url = await tic_server.start()
+    tic_server.url = url
+    yield tic_server
+    await tic_server.stop()
+
+
+@pytest.fixture
+async def reader(server):
+    """Return a started reader of the server."""
+    tic_reader = TeleinfoReader(server.url, "standard")
+    tic_reader.start()
+    yield tic_reader
+    await tic_reader.stop()
+
+
+async def test_receives_frames(reader):
+    """Frames sent over TCP go through the parser and the checksums."""
+    async with asyncio.timeout(5):
+        await reader.frame_received.wait()
+    assert reader.available
+    labels = {group.label for group in reader.frame}
+    assert {b'ADSC', b'EAST', b'SINSTS', b'PRM'} <= labels
+    assert reader.invalid_groups == 0
+
+
+async def test_reconnects_at_once(server, reader):
+    """A dropped working link is reopened without backoff."""
+    async with asyncio.timeout(5):
+        await reader.frame_received.wait()
+    frames = reader.frames_received
+
+    availability = []
+    reader.availability_callback = availability.append
+    server.drop_clients()
+    async with asyncio.timeout(1):
+        while server.connections < 2 or reader.frames_received <= frames + 1:
+            await asyncio.sleep(0.01)
+
+    assert reader.reconnections == 1
+    assert availability == [False, True]
+    assert reader.available
+
+
+async def test_detects_mode_from_frame(socket_enabled):
+    """The TIC mode of a network source is told by its frames, not the baud rate."""
+    for ticmode in ("historical", "standard"):
+        tic_server = TicServer(ticmode=ticmode)
+        url = await tic_server.start()
+        try:
+            found = await asyncio.get_running_loop().run_in_executor(
+                None, _listen, url, 9600, 3
+            )
+        finally:
+            await tic_server.stop()
+        assert found == ticmode
+
+
+async def test_reconnects_after_callback_error(server, reader):
+    """An exception raised by a frame callback backs off and reconnects, the task survives."""
+    raised = []
+
+    def frame_callback(frame):
+        if not raised:
+            raised.append(frame)
+            raise KeyError("boom")
+
+    reader.frame_callback = frame_callback
+    async with asyncio.timeout(5):
+        while not raised or reader.reconnections < 1 or not reader.available:
+            await asyncio.sleep(0.01)
+
+    frames = reader.frames_received
+    async with asyncio.timeout(1):
+        while reader.frames_received <= frames:
+            await asyncio.sleep(0.01)
+    assert server.connections == 2
@@ -0,0 +1,23 @@
+"""Tests of the offline replay through the coordinator and the label sensors."""
+import pytest
+
+from custom_components.teleinfo.replay import async_replay, sample_capture
+
+
+@pytest.mark.parametrize("ticmode", ["historical", "standard"])
+async def test_replay_writes_states(ticmode):
+    """Every frame goes through the coordinator, only changed values are written."""
+    stats = await async_replay(sample_capture(ticmode, 20), ticmode, trace_memory=True)
+    assert stats.frames == 20
+    assert stats.invalid_groups == 0
+    assert 0 < stats.state_writes < stats.values
+    assert stats.state_writes + stats.skipped_writes == stats.values
+    assert stats.rejected_values == 0
+    assert 0 < stats.frame_memory_mean <= stats.frame_memory_max
+
+
+async def test_replay_drops_corrupted_groups():
+    """Corrupted groups are counted and never reach the sensors."""
+    stats = await async_replay(sample_capture("standard", 20, corrupt=0.1), "standard")
+    assert stats.invalid_groups
+    assert stats.values <= stats.groups
@@ -0,0 +1,79 @@
+"""Tests of the scheduler shared by the meters."""
+import datetime
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.teleinfo.coordinator import TeleinfoCoordinator
+from custom_components.teleinfo.scheduler import async_get_scheduler
+
+from .common import StandInReader, receive_frame
+
+
+def add_meter(hass, port, seconds=30):
+    """Add a meter refreshed every seconds to the scheduler and return its coordinator."""
+    coordinator = TeleinfoCoordinator(
+        hass, StandInReader("standard", port), "standard", datetime.timedelta(seconds=seconds)
+    )
+    async_get_scheduler(hass).async_add_meter(coordinator)
+    return coordinator
+
+
+async def tick(hass, seconds):
+    """Move the time forward by seconds."""
+    async_fire_time_changed(hass, dt_util.utcnow() + datetime.timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+async def test_shared_refresh(hass):
+    """Meters sharing a refresh interval are refreshed by the same tick, others by theirs."""
+    first = add_meter(hass, "/dev/ttyTIC0")
+    second = add_meter(hass, "/dev/ttyTIC1")
+    slow = add_meter(hass, "/dev/ttyTIC2", 60)
+    scheduler = async_get_scheduler(hass)
+    assert scheduler.coordinators == [first, second, slow]
+    assert all(coordinator.reader.started for coordinator in scheduler.coordinators)
+
+    # The first frame of each meter is published at once
+    for coordinator in scheduler.coordinators:
+        receive_frame(coordinator, [("SINSTS", None, "00100")], refresh=False)
+    await hass.async_block_till_done()
+    assert all(coordinator.data["SINSTS"][0] == "00100" for coordinator in scheduler.coordinators)
+
+    for coordinator in scheduler.coordinators:
+        receive_frame(coordinator, [("SINSTS", None, "00200")], refresh=False)
+    await tick(hass, 31)
+    assert first.data["SINSTS"][0] == "00200"
+    assert second.data["SINSTS"][0] == "00200"
+    assert slow.data["SINSTS"][0] == "00100"
+    await tick(hass, 61)
+    assert slow.data["SINSTS"][0] == "00200"
+
+    await scheduler.async_shutdown()
+    assert scheduler.coordinators == []
+    assert not any(coordinator.reader.started for coordinator in (first, second, slow))
+
+
+async def test_add_remove(hass):
+    """A removed meter is stopped and no longer refreshed, the others still are."""
+    first = add_meter(hass, "/dev/ttyTIC0")
+    second = add_meter(hass, "/dev/ttyTIC1")
+    scheduler = async_get_scheduler(hass)
+    for coordinator in (first, second):
+        receive_frame(coordinator, [("SINSTS", None, "00100")], refresh=False)
+    await hass.async_block_till_done()
+
+    await scheduler.async_remove_meter(first)
+    assert not first.reader.started
+    assert second.reader.started
+    assert scheduler.coordinators == [second]
+
+    for coordinator in (first, second):
+        receive_frame(coordinator, [("SINSTS", None, "00200")], refresh=False)
+    await tick(hass, 31)
+    assert first.data["SINSTS"][0] == "00100"
+    assert second.data["SINSTS"][0] == "00200"
+
+    # Removing the last meter of an interval cancels its timer
+    await scheduler.async_remove_meter(second)
+    assert scheduler.coordinators == []
@@ -0,0 +1,148 @@
+"""Tests of the label sensors: write filters, index guard and unique id migration."""
+import dataclasses
+
+from homeassistant.helpers import entity_registry as er
+import pytest
+
+from custom_components.teleinfo import sensor
+from custom_components.teleinfo.const import TELEINFO_LABELS
+from custom_components.teleinfo.sensor import CONF_DEADBAND, CONF_MIN_INTERVAL
+
+from .common import RecordingSensorEntity, receive_frame
+
+
+def label(ticmode, key):
+    """Return the catalog entry of a label."""
+    return TELEINFO_LABELS[ticmode][key.encode("ascii")]
+
+
+@pytest.fixture
+def add_sensor(coordinator, clock):
+    """Return a function subscribing a sensor of a label to the coordinator."""
+
+    def _add_sensor(description, write_filter=None):
+        entity = RecordingSensorEntity(coordinator, "041876097556", None, description, write_filter)
+        coordinator.async_add_listener(description.key, entity._on_update)
+        return entity
+
+    return _add_sensor
+
+
+def test_deadband(coordinator, add_sensor):
+    """A change within the deadband is not written, a larger one is."""
+    entity = add_sensor(
+        label("standard", "SINSTS"), {CONF_DEADBAND: 10, CONF_MIN_INTERVAL: 0}
+    )
+    for value in ("00750", "00755", "00760", "00771"):
+        receive_frame(coordinator, [("SINSTS", None, value)])
+    assert entity.writes == [750, 771]
+    assert coordinator.state_writes == 2
+    assert coordinator.skipped_writes == 2
+
+
+def test_min_interval(coordinator, add_sensor, clock):
+    """Changes closer than min_interval are coalesced into the next write."""
+    entity = add_sensor(
+        label("standard", "SINSTS"), {CONF_DEADBAND: 0, CONF_MIN_INTERVAL: 30}
+    )
+    for elapsed, value in ((0, "00750"), (10, "00800"), (20, "00900"), (31, "00950")):
+        clock.now = 1000.0 + elapsed
+        receive_frame(coordinator, [("SINSTS", None, value)])
+    assert entity.writes == [750, 950]
+
+
+def test_unchanged_value_not_converted(coordinator, add_sensor):
+    """A raw value identical to the last written one is neither converted nor written."""
+    conversions = []
+
+    def converter(raw):
+        conversions.append(raw)
+        return int(raw)
+
+    entity = add_sensor(dataclasses.replace(label("standard", "SINSTS"), converter=converter))
+    for value in ("00750", "00750", "00750", "00800"):
+        receive_frame(coordinator, [("SINSTS", None, value)])
+    assert conversions == ["00750", "00800"]
+    assert entity.writes == [750, 800]
+    assert coordinator.skipped_writes == 2
+
+
+def test_index_decrease_confirmed(coordinator, add_sensor, clock):
+    """A decreasing index is held back until received on 3 consecutive updates."""
+    entity = add_sensor(label("standard", "EAST"))
+    receive_frame(coordinator, [("EAST", None, "000010000")])
+    for elapsed in (1, 2, 3):
+        clock.now = 1000.0 + elapsed
+        receive_frame(coordinator, [("EAST", None, "000009000")])
+    assert entity.writes == [10000, 9000]
+    assert coordinator.rejected_values == 2
+
+
+def test_index_jump_rejected(coordinator, add_sensor, clock):
+    """An index increasing faster than 50 Wh/s is rejected, a slower increase is not."""
+    entity = add_sensor(label("standard", "EAST"))
+    receive_frame(coordinator, [("EAST", None, "000010000")])
+    clock.now += 9
+    # At most 50 Wh/s over the 9 s since the last write, plus one second
+    receive_frame(coordinator, [("EAST", None, "000010501")])
+    assert entity.writes == [10000]
+    assert coordinator.rejected_values == 1
+    receive_frame(coordinator, [("EAST", None, "000010500")])
+    assert entity.writes == [10000, 10500]
+    assert coordinator.rejected_values == 1
+
+
+def test_index_increase_accepted(coordinator, add_sensor, clock):
+    """A plausible increase is written at once, and ends a pending confirmation."""
+    entity = add_sensor(label("standard", "EAST"))
+    for elapsed, value in ((0, "000010000"), (1, "000009000"), (2, "000010020"), (3, "000009000")):
+        clock.now = 1000.0 + elapsed
+        receive_frame(coordinator, [("EAST", None, value)])
+    assert entity.writes == [10000, 10020]
+    assert coordinator.rejected_values == 2
+
+
+@pytest.fixture
+def add_meter_entities(coordinator):
+    """Create the entities of the coordinator as the platform does, return them."""
+    entities = []
+    sensor._async_add_meter_entities(coordinator, entities.extend, {})
+    return entities
+
+
+METER_FRAME = [("PRM", None, "21490012345678"), ("EAST", None, "012345678")]
+LEGACY_UNIQUE_ID = "teleinfo-teleinfo energie active soutirée totale"
+
+
+async def test_legacy_unique_id_migration(hass, coordinator, add_meter_entities):
+    """The legacy total energy sensor becomes the EAST sensor of the meter."""
+    entity_registry = er.async_get(hass)
+    legacy = entity_registry.async_get_or_create(
+        "sensor", "teleinfo", LEGACY_UNIQUE_ID,
+        suggested_object_id="teleinfo_energie_active_soutiree_totale",
+    )
+    receive_frame(coordinator, METER_FRAME)
+
+    migrated = entity_registry.async_get(legacy.entity_id)
+    assert migrated.unique_id == "teleinfo-21490012345678-EAST"
+    assert migrated.entity_id == "sensor.teleinfo_energie_active_soutiree_totale"
+    east = next(entity for entity in add_meter_entities if entity.unique_id == migrated.unique_id)
+    assert east.entity_description.key == "EAST"
+
+
+async def test_legacy_unique_id_kept(hass, coordinator, add_meter_entities):
+    """A meter whose EAST sensor already exists does not take the legacy sensor."""
+    entity_registry = er.async_get(hass)
+    legacy = entity_registry.async_get_or_create("sensor", "teleinfo", LEGACY_UNIQUE_ID)
+    entity_registry.async_get_or_create("sensor", "teleinfo", "teleinfo-21490012345678-EAST")
+    receive_frame(coordinator, METER_FRAME)
+    assert entity_registry.async_get(legacy.entity_id).unique_id == LEGACY_UNIQUE_ID
+
+
+@pytest.mark.parametrize("ticmode", ["historical"])
+async def test_legacy_unique_id_historical(hass, coordinator, add_meter_entities):
+    """Historical meters, which do not send EAST, leave the legacy sensor alone."""
+    entity_registry = er.async_get(hass)
+    legacy = entity_registry.async_get_or_create("sensor", "teleinfo", LEGACY_UNIQUE_ID)
+    receive_frame(coordinator, [("ADCO", None, "031762120162"), ("BASE", None, "012345678")])
+    assert entity_registry.async_get(legacy.entity_id).unique_id == LEGACY_UNIQUE_ID